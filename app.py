@@ -1,183 +1,316 @@
-from flask import Flask, render_template, jsonify, request
-import pandas as pd
-import pandas_ta as ta
+from flask import Flask, Response, render_template, jsonify, request
 import os
 from pathlib import Path
 import time
 from threading import Thread
 
+from candleStore import CandleStore
+from exportJobs import ExportJobQueue, publish_latest, write_atomic
+from chartPayload import (
+    epoch_seconds, candle_records, line_records, signal_records, columnar_payload,
+    encode_cursor, decode_cursor, page_bounds, since_start,
+)
+from ingest import MANIFEST_FILE, ingest_nifty_txt_files, store_version
+from partitionStore import read_all
+from signals import (
+    SIGNAL_START, SIGNAL_END, ENTRY_DAY, compute_indicator_frame, mark_crossovers, restrict_signals,
+    find_entry_points, write_entry_points,
+)
+from indicators import IndicatorCache, IndicatorEngine, IndicatorSeries, warmup_bars
+from liveStream import SERIES_KEYS, BarBroadcaster, FileTailFeed, latest_bar_time, sse_events
+from replay import HistoricalReplay, parse_speed
+from httpCache import IMMUTABLE, REVALIDATE, ResponseCache, make_etag
+
 app = Flask(__name__)
 
 # -------------------- Local Data Config --------------------
 DATA_DIR = Path("data")  # Folder containing monthly NIFTY .txt files
-CACHE_FILE = Path("data/nifty_combined.parquet")
-ENTRY_FILE = Path("entrypoints.xlsx")  # Excel output file
-
+STORE_DIR = Path("data/nifty_candles")  # Month-partitioned parquet candle store
+ENTRY_FILE = Path("entrypoints.parquet")  # Typed entry points for the backtester
+ENTRY_EXCEL_FILE = Path("entrypoints.xlsx")  # Optional Excel report
+EXPORT_DIR = Path("exports")  # Per-job export files (latest per parameter set)
+
+# Set NIFTY_MMAP=1 when running several worker processes: the 1m OHLC base is
+# written to a fixed-layout binary that every worker maps read-only instead of
+# holding its own copy (NIFTY_MMAP_FLOAT=float32 halves it again).
+MMAP_FILE = STORE_DIR / "ohlc.bin"
+USE_MMAP = os.environ.get("NIFTY_MMAP", "0") == "1"
+MMAP_FLOAT = os.environ.get("NIFTY_MMAP_FLOAT", "float64")
+
+# Set NIFTY_TAIL_FILE to a .txt file (monthly-file line format, appended in
+# time order) to feed it into the live stream as new bars arrive.
+TAIL_FILE = os.environ.get("NIFTY_TAIL_FILE")
+
+# Set NIFTY_REPLAY to a speed (1, 60, max) to replay the monthly files as a
+# simulated live feed from NIFTY_REPLAY_FROM on; the hourly refresh is off then.
+REPLAY_SPEED = os.environ.get("NIFTY_REPLAY")
+REPLAY_FROM = os.environ.get("NIFTY_REPLAY_FROM", "2023-12-01")
+
+
+def update_store_from_txt_files():
+    """Brings the partitioned store up to date with the monthly NIFTY .txt files (changed files only)."""
+    print("📂 Checking NIFTY monthly txt files...")
+    _, changed, removed = ingest_nifty_txt_files(DATA_DIR, STORE_DIR, read=False)
+    if changed or removed:
+        print(f"✅ Re-parsed {len(changed)} changed files ({len(removed)} removed) into {STORE_DIR}.")
+    else:
+        print("✅ No txt changes.")
 
-def read_all_nifty_txt_files():
-    """Reads and merges all monthly NIFTY .txt files into a single DataFrame."""
-    print("📂 Reading all NIFTY monthly txt files...")
-    all_files = sorted(DATA_DIR.glob("*.txt"))
-    if not all_files:
-        raise FileNotFoundError("No .txt files found in /data folder")
 
-    dfs = []
-    for file in all_files:
-        try:
-            df = pd.read_csv(
-                file,
-                header=None,
-                names=["Symbol", "Date", "Time", "Open", "High", "Low", "Close", "X1", "X2"],
-            )
-            df["Datetime"] = pd.to_datetime(df["Date"].astype(str) + " " + df["Time"])
-            df = df[["Datetime", "Open", "High", "Low", "Close"]].sort_values("Datetime")
-            dfs.append(df)
-        except Exception as e:
-            print(f"⚠️ Error reading {file.name}: {e}")
-
-    full_df = pd.concat(dfs, ignore_index=True).drop_duplicates(subset="Datetime")
-    full_df.to_parquet(CACHE_FILE, index=False)
-    print(f"✅ Combined {len(dfs)} files → {len(full_df)} rows saved to cache.")
-    return full_df
+def read_store():
+    """(candles, store version) from the partitioned store."""
+    # version first: a write landing in between is picked up by the next refresh
+    source = store_version(STORE_DIR)
+    return read_all(STORE_DIR), source
 
 
 def load_cached_or_fresh_data():
-    """Load data from cache or rebuild from txt files if needed."""
-    if CACHE_FILE.exists():
-        file_age = time.time() - CACHE_FILE.stat().st_mtime
+    """Load data from the partitioned store or rebuild from txt files if needed."""
+    manifest = STORE_DIR / MANIFEST_FILE
+    if manifest.exists():
+        file_age = time.time() - manifest.stat().st_mtime
         if file_age < 3600:  # 1 hour cache
-            print(f"⚡ Using cached parquet ({file_age/60:.1f} min old)")
-            return pd.read_parquet(CACHE_FILE)
-        else:
-            print("♻️ Cache old (>1h), rebuilding from txt files...")
-            return read_all_nifty_txt_files()
+            print(f"⚡ Using cached partitions ({file_age/60:.1f} min old)")
+            return read_store()
+        print("♻️ Cache old (>1h), checking txt files...")
+    update_store_from_txt_files()
+    return read_store()
+
+
+# Resident, pre-indexed candles shared by all requests (swapped on refresh)
+candle_store = CandleStore(
+    load_cached_or_fresh_data,
+    mmap_path=MMAP_FILE if USE_MMAP else None,
+    float_dtype=MMAP_FLOAT,
+)
+
+# LRU of indicator frames keyed by (interval, rsi_period, rsi_avg)
+indicator_cache = IndicatorCache(maxsize=32)
+
+# Spreadsheet exports run here, off the request path
+export_queue = ExportJobQueue(max_workers=2)
+
+
+def build_indicator_series(level, rsi_period=9, rsi_avg=3, previous=None, stable=None, version=None):
+    """
+    Indicator series for an interval level, extending `previous` when only
+    new bars arrived (`stable`: leading bars unchanged since it was built).
+    """
+    if previous is not None:
+        extended = previous.extend(level, stable, version)
+        if extended is not None:
+            mark_crossovers(extended.frame)
+            return extended
+
+    df = compute_indicator_frame(level, rsi_period, rsi_avg)
+    engine = IndicatorEngine(rsi_period, rsi_avg)
+    engine.seed(df["Close"], df["RSI_Base"])
+    return IndicatorSeries(df, engine, version)
+
+
+def get_indicator_frame(snapshot, interval="1m", rsi_period=9, rsi_avg=3):
+    """Full-history indicator frame, cached per (interval, RSI params) for this data version."""
+    def compute(previous):
+        stable = snapshot.stable_rows(interval, previous.version) if previous is not None else None
+        return build_indicator_series(
+            snapshot.level(interval), rsi_period, rsi_avg, previous, stable, snapshot.version,
+        )
+
+    return indicator_cache.get_or_compute(snapshot.version, (interval, rsi_period, rsi_avg), compute).frame
+
+
+def export_entry_points(interval="1m", rsi_period=9, rsi_avg=3, start=None, end=None, excel=False, snapshot=None):
+    """
+    Queue the entry-point export on the background pool and return its job.
+    Each job writes exports/entrypoints-<job id>.parquet (plus .xlsx when
+    excel=True) and then publishes a copy as entrypoints.parquet / .xlsx,
+    the latest export the backtester reads. Identical requests for the same
+    data version share one job; once a newer data version's export of the
+    same parameters finishes, the older job's files are deleted.
+    """
+    snapshot = snapshot or candle_store.get()
+    if interval not in snapshot.levels:
+        interval = "1m"
+    entry_range = (start, end) if start or end else (ENTRY_DAY, ENTRY_DAY)
+    params = {
+        "interval": interval, "rsi_period": rsi_period, "rsi_avg": rsi_avg,
+        "start": entry_range[0], "end": entry_range[1], "data_version": snapshot.data_version,
+        "excel": bool(excel),
+    }
+    group = ExportJobQueue.job_id({k: v for k, v in params.items() if k != "data_version"})
+
+    def run(job_id):
+        df = get_indicator_frame(snapshot, interval, rsi_period, rsi_avg)
+        df_entries = find_entry_points(df, *entry_range)
+        if df_entries.empty:
+            print(f"ℹ️ No valid entry signals found for {entry_range[0]} → {entry_range[1]}")
+            return 0, []
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        job_file = EXPORT_DIR / f"{ENTRY_FILE.stem}-{job_id}{ENTRY_FILE.suffix}"
+        write_entry_points(df_entries, job_file)
+        files = [job_file]
+        if excel:
+            excel_file = EXPORT_DIR / f"{ENTRY_EXCEL_FILE.stem}-{job_id}{ENTRY_EXCEL_FILE.suffix}"
+            write_atomic(excel_file, lambda tmp: df_entries.to_excel(tmp, index=False))
+            files.append(excel_file)
+            publish_latest(excel_file, ENTRY_EXCEL_FILE)
+        publish_latest(job_file, ENTRY_FILE)
+        print(f"✅ Saved {len(df_entries)} entry points → {job_file} (latest: {ENTRY_FILE})")
+        return len(df_entries), files
+
+    return export_queue.submit(params, run, group)
+
+
+def _next_cursor(interval, page, start):
+    """Opaque cursor for the next older page, None once history is exhausted."""
+    if start > 0 and len(page):
+        return encode_cursor(interval, epoch_seconds(page.index[:1])[0])
+    return None
+
+
+def prepare_windowed_page(level, limit=1000, before_ts=None, interval="1m", rsi_period=9, rsi_avg=3, warmup=None):
+    """
+    Compute indicators for one page on just the page plus a warm-up margin.
+
+    Skips the indicator cache and the full-history pass; SMA columns are
+    exact and RSI stays within the bound documented in indicators.warmup_bars
+    (default margin: weight of the dropped history <= 1e-6). Entry points are
+    not exported in this mode.
+    """
+    if warmup is None:
+        warmup = warmup_bars(rsi_period, rsi_avg)
+    start, stop = page_bounds(level.index, int(before_ts) if before_ts else None, limit)
+    span_start = max(0, start - max(0, int(warmup)))  # a negative margin would cut the page
+    span = compute_indicator_frame(level.iloc[span_start:stop], rsi_period, rsi_avg)
+    page = span.iloc[start - span_start:]
+    return page, _next_cursor(interval, page, start)
+
+
+def with_markers(page, start=None, end=None):
+    """Page plus the Signal column: crossovers inside [start, end] (default Dec 2023)."""
+    if start is None and end is None:
+        start, end = SIGNAL_START, SIGNAL_END
+    return page.assign(Signal=restrict_signals(page.index, page["Cross"], start, end))
+
+
+def prepare_chart_frame(limit=1000, before_ts=None, interval="1m", rsi_period=9, rsi_avg=3,
+                        windowed=False, warmup=None, start=None, end=None, snapshot=None):
+    """
+    Return the page of candles + indicator columns to display. Markers cover
+    [start, end] when given, otherwise Dec 2023. Pass `snapshot` to pin the
+    data version (default: the current one).
+    """
+    snapshot = snapshot or candle_store.get()
+    if interval not in snapshot.levels:
+        interval = "1m"
+
+    # Latency over exactness: indicators on page + warm-up only
+    if windowed:
+        page, next_cursor = prepare_windowed_page(
+            snapshot.level(interval), limit, before_ts, interval, rsi_period, rsi_avg, warmup
+        )
+        return with_markers(page, start, end), next_cursor
+
+    df = get_indicator_frame(snapshot, interval, rsi_period, rsi_avg)
+
+    # --- Handle infinite scroll (binary search on the sorted index) ---
+    first, stop = page_bounds(df.index, int(before_ts) if before_ts else None, limit)
+    page = with_markers(df.iloc[first:stop], start, end)
+
+    return page, _next_cursor(interval, page, first)
+
+
+def prepare_delta(snapshot, interval="1m", rsi_period=9, rsi_avg=3, since=0, start=None, end=None):
+    """Bars, indicator values and markers with time >= epoch second `since`."""
+    if interval not in snapshot.levels:
+        interval = "1m"
+    df = get_indicator_frame(snapshot, interval, rsi_period, rsi_avg)
+    return with_markers(df.iloc[since_start(df.index, since):], start, end)
+
+
+def delta_response(since, interval="1m", rsi_period=9, rsi_avg=3, start=None, end=None, version=None,
+                   columnar=False, snapshot=None):
+    """
+    Body for ?since= polling: bars (including the still-forming last one),
+    indicator points and markers at or after `since`, plus the data version.
+    A client that sends back the version it already has gets an empty
+    delta without touching the indicator frame.
+    """
+    snapshot = snapshot or candle_store.get()
+    if version == snapshot.data_version:
+        df = None
     else:
-        return read_all_nifty_txt_files()
+        df = prepare_delta(snapshot, interval, rsi_period, rsi_avg, since, start, end)
+    if columnar:
+        payload = columnar_payload(df) if df is not None else {
+            "format": "columnar", "time": [], **{k: [] for k in SERIES_KEYS}, "signals": [],
+        }
+    else:
+        rows = format_chart_rows(df) if df is not None else ([], [], [], [], [], [])
+        payload = dict(zip(("candlestick", "sma5", "sma20", "rsi_base", "rsi_avg", "signals"), rows))
+    payload["data_version"] = snapshot.data_version
+    payload["since"] = since
+    return payload
 
 
-def prepare_chart_data(limit=1000, before_ts=None, interval="1m", rsi_period=9, rsi_avg=3):
-    """Return data formatted for chart display with RSI crossover signals (restricted to Dec 2023)."""
-    df = load_cached_or_fresh_data()
-    df = df.set_index("Datetime").sort_index()
-
-    # Supported intervals
-    interval_map = {
-        "1m": "1min", "3m": "3min", "5m": "5min", "10m": "10min",
-        "15m": "15min", "30m": "30min", "1h": "1H", "2h": "2H",
-        "4h": "4H", "1d": "1D"
-    }
-    freq = interval_map.get(interval, "1min")
-
-    # Resample all candles
-    df = df.resample(freq).agg({
-        "Open": "first",
-        "High": "max",
-        "Low": "min",
-        "Close": "last"
-    }).dropna()
-
-    # ✅ Indicators (applied globally to all data)
-    df["SMA_5"] = ta.sma(df["Close"], length=5)
-    df["SMA_20"] = ta.sma(df["Close"], length=20)
-    df["RSI_Base"] = ta.rsi(df["Close"], length=rsi_period)
-    df["RSI_Avg"] = ta.sma(df["RSI_Base"], length=rsi_avg)
-
-    # --- Restrict crossover signals to December 2023 only ---
-    df["Signal"] = None
-    df["RSI_Diff"] = df["RSI_Base"] - df["RSI_Avg"]
-    df["Prev_Diff"] = df["RSI_Diff"].shift(1)
-
-    df_dec = df.loc["2023-12-01":"2023-12-31"].copy()
-
-    cross_buy = df_dec[(df_dec["RSI_Diff"] > 0) & (df_dec["Prev_Diff"] <= 0)]
-    cross_sell = df_dec[(df_dec["RSI_Diff"] < 0) & (df_dec["Prev_Diff"] >= 0)]
-
-    # ✅ Apply only if any valid crossovers exist
-    if not cross_buy.empty:
-        df.loc[cross_buy.index, "Signal"] = "buy"
-    if not cross_sell.empty:
-        df.loc[cross_sell.index, "Signal"] = "sell"
-
-
-    # --- Entry signal logic: only for 29 Dec 2023 ---
-    df_day = df.loc["2023-12-26"]
-    entry_records = []
-
-    for i in range(len(df_day) - 2):
-        ts = df_day.index[i]
-        signal = df_day.iloc[i]["Signal"]
-
-        # Skip if not a marker
-        if signal not in ["buy", "sell"]:
-            continue
-
-        first = df_day.iloc[i]
-        second = df_day.iloc[i + 1]
-        third = df_day.iloc[i + 2]
-
-        # BUY logic
-        if signal == "buy":
-            if second["High"] > first["High"] and third["High"] > second["High"]:
-                entry_records.append({
-                    "Type": "Buy CE",
-                    "Time": third.name.strftime("%Y-%m-%d %H:%M:%S"),
-                    "EntryPrice": round(second["High"], 2),
-                    "ClosePrice": round(second["Close"], 2)
-                })
-
-        # SELL logic
-        elif signal == "sell":
-            if second["Low"] < first["Low"] and third["Low"] < second["Low"]:
-                entry_records.append({
-                    "Type": "Buy PE",
-                    "Time": third.name.strftime("%Y-%m-%d %H:%M:%S"),
-                    "EntryPrice": round(second["Low"], 2),
-                    "ClosePrice": round(second["Close"], 2)
-                })
-
-    # Write results to Excel if any entries found
-    if entry_records:
-        df_entries = pd.DataFrame(entry_records)
-        df_entries.to_excel(ENTRY_FILE, index=False)
-        print(f"✅ Saved {len(df_entries)} entry points → {ENTRY_FILE}")
-    else:
-        print("ℹ️ No valid entry signals found for 29-Dec-2023")
-
-    # --- Handle infinite scroll ---
-    if before_ts:
-        cutoff = pd.to_datetime(int(before_ts), unit="s")
-        df = df[df.index < cutoff]
-
-    df = df.tail(limit)
-
-    # --- Convert to frontend format ---
-    candles = [
-        {"time": int(ts.timestamp()), "open": r.Open, "high": r.High, "low": r.Low, "close": r.Close}
-        for ts, r in df.iterrows()
-    ]
-    sma5 = [{"time": int(ts.timestamp()), "value": r.SMA_5} for ts, r in df.iterrows() if not pd.isna(r.SMA_5)]
-    sma20 = [{"time": int(ts.timestamp()), "value": r.SMA_20} for ts, r in df.iterrows() if not pd.isna(r.SMA_20)]
-    rsi_base = [{"time": int(ts.timestamp()), "value": r.RSI_Base if not pd.isna(r.RSI_Base) else 0} for ts, r in df.iterrows()]
-    rsi_avg_line = [{"time": int(ts.timestamp()), "value": r.RSI_Avg if not pd.isna(r.RSI_Avg) else 0} for ts, r in df.iterrows()]
-
-    # --- Buy/Sell markers only for Dec 2023 ---
-    signals = []
-    for ts, r in df.iterrows():
-        if r.Signal == "buy":
-            signals.append({"time": int(ts.timestamp()), "position": "aboveBar", "color": "green", "shape": "arrowUp", "text": "Buy"})
-        elif r.Signal == "sell":
-            signals.append({"time": int(ts.timestamp()), "position": "aboveBar", "color": "red", "shape": "arrowDown", "text": "Sell"})
+def stream_delta(snapshot, key, since):
+    """Columnar delta for a live-stream channel key (interval, rsi_period, rsi_avg, start, end)."""
+    interval, rsi_period, rsi_avg, start, end = key
+    payload = columnar_payload(prepare_delta(snapshot, interval, rsi_period, rsi_avg, since, start, end))
+    payload["data_version"] = snapshot.data_version
+    return payload
+
+
+live_stream = BarBroadcaster(
+    candle_store, stream_delta, lambda snapshot, key: latest_bar_time(snapshot.level(key[0])),
+)
+replay_feed = None  # HistoricalReplay when NIFTY_REPLAY is set
+http_cache = ResponseCache()  # encoded chart API bodies by ETag
+
+
+def format_chart_rows(df):
+    """Convert a chart page to the per-point series the frontend expects."""
+    # --- Convert to frontend format (column arrays, one pass per series) ---
+    times = epoch_seconds(df.index)
+    candles = candle_records(times, df)
+    sma5 = line_records(times, df["SMA_5"])
+    sma20 = line_records(times, df["SMA_20"])
+    rsi_base = line_records(times, df["RSI_Base"], fill=0)
+    rsi_avg_line = line_records(times, df["RSI_Avg"], fill=0)
+
+    # --- Buy/Sell markers (restricted to the requested signal range) ---
+    signals = signal_records(times, df["Signal"].to_numpy())
 
     return candles, sma5, sma20, rsi_base, rsi_avg_line, signals
 
 
+def prepare_chart_data(limit=1000, before_ts=None, interval="1m", rsi_period=9, rsi_avg=3):
+    """Return data formatted for chart display with RSI crossover signals (restricted to Dec 2023)."""
+    df, _ = prepare_chart_frame(limit, before_ts, interval, rsi_period, rsi_avg)
+    return format_chart_rows(df)
+
+
 # -------------------- Background refresher --------------------
+def refresh_from_store():
+    """
+    Ingest changed txt files, then reload whenever the store holds other data
+    than this worker serves, including data another worker ingested.
+    """
+    update_store_from_txt_files()
+    candle_store.get()
+    if store_version(STORE_DIR) == candle_store.source:
+        return False
+    candle_store.publish(*read_store())
+    print(f"🔄 Cache refreshed from store version {candle_store.source} "
+          f"(data version {candle_store.data_version}).")
+    return True
+
+
 def refresh_cache_periodically():
-    """Rebuild combined cache every hour."""
+    """Re-check the txt files and the shared store every hour."""
     while True:
         try:
-            read_all_nifty_txt_files()
-            print("🔄 Cache refreshed successfully.")
+            refresh_from_store()
         except Exception as e:
             print(f"⚠️ Cache refresh failed: {e}")
         time.sleep(3600)
@@ -197,22 +330,149 @@ def get_nifty_data():
     rsi_period = int(request.args.get("rsi_period", 9))
     rsi_avg = int(request.args.get("rsi_avg", 3))
 
-    candles, sma5, sma20, rsi_base, rsi_avg_line, signals = prepare_chart_data(
-        limit, before_ts, interval, rsi_period, rsi_avg
+    # Cursor from a previous page takes precedence over a raw `before`
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            _, before_ts = decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    # ?indicators=window computes on the page + warm-up margin (?warmup=N bars)
+    windowed = request.args.get("indicators") == "window"
+    warmup = request.args.get("warmup", type=int)
+    if warmup is not None:
+        warmup = max(0, warmup)
+
+    # Optional signal/entry range, e.g. ?start=2023-01-01&end=2023-12-31
+    start = request.args.get("start")
+    end = request.args.get("end")
+
+    # Polling delta: ?since=<epoch s> returns only bars at/after it
+    since = request.args.get("since", type=int)
+    columnar = request.args.get("format") == "columnar"
+
+    # Validators: a page strictly before the last bar never changes, so its
+    # ETag leaves out the data version and browsers/proxies may keep it. The
+    # body is built from this same snapshot, so it always matches its tag.
+    snapshot = candle_store.get()
+    level = snapshot.level(interval)
+    historical = since is None and before_ts is not None and int(before_ts) <= latest_bar_time(level)
+    etag = make_etag(
+        None if historical else snapshot.data_version, request.path, sorted(request.args.items(multi=True)),
+    )
+    cache_control = IMMUTABLE if historical else REVALIDATE
+
+    if since is not None:
+        return http_cache.respond(request, etag, cache_control, lambda: delta_response(
+            since, interval, rsi_period, rsi_avg, start, end, request.args.get("version"), columnar,
+            snapshot=snapshot,
+        ))
+
+    def build():
+        df, next_cursor = prepare_chart_frame(
+            limit, before_ts, interval, rsi_period, rsi_avg,
+            windowed=windowed, warmup=warmup, start=start, end=end, snapshot=snapshot,
+        )
+
+        # Entry points go to the background export queue (not in windowed
+        # mode, and only from the head page: scroll-back pages stay immutable)
+        export_job = None
+        if not windowed and not historical:
+            export_job = export_entry_points(interval, rsi_period, rsi_avg, start, end, snapshot=snapshot).id
+
+        # Compact parallel arrays instead of one object per point
+        if columnar:
+            payload = columnar_payload(df)
+            payload["next_cursor"] = next_cursor
+            payload["export_job"] = export_job
+            return payload
+
+        candles, sma5, sma20, rsi_base, rsi_avg_line, signals = format_chart_rows(df)
+
+        return {
+            "candlestick": candles,
+            "sma5": sma5,
+            "sma20": sma20,
+            "rsi_base": rsi_base,
+            "rsi_avg": rsi_avg_line,
+            "signals": signals,
+            "next_cursor": next_cursor,
+            "export_job": export_job
+        }
+
+    return http_cache.respond(request, etag, cache_control, build)
+
+
+@app.route('/api/stream/nifty')
+def stream_nifty():
+    """
+    Server-sent events with new/updated bars, indicator points and markers
+    (columnar format). ?since=<epoch s> replays bars from that time first;
+    ?throttle=<s> merges updates arriving within that window.
+    """
+    interval = request.args.get("interval", "1m")
+    if interval not in candle_store.get().levels:
+        interval = "1m"
+    key = (
+        interval,
+        int(request.args.get("rsi_period", 9)),
+        int(request.args.get("rsi_avg", 3)),
+        request.args.get("start"),
+        request.args.get("end"),
     )
+    since = request.args.get("since", type=int)
+    throttle = request.args.get("throttle", 0.0, type=float)
+    sub = live_stream.subscribe(key, since)
+    return Response(
+        sse_events(live_stream, sub, throttle),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route('/api/export/entrypoints', methods=['POST'])
+def post_entrypoints_export():
+    job = export_entry_points(
+        request.args.get("interval", "1m"),
+        int(request.args.get("rsi_period", 9)),
+        int(request.args.get("rsi_avg", 3)),
+        request.args.get("start"),
+        request.args.get("end"),
+        excel=request.args.get("excel") == "1",
+    )
+    return jsonify(job.to_dict()), 202
 
+
+@app.route('/api/export/jobs/<job_id>')
+def get_export_job(job_id):
+    job = export_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"unknown export job {job_id}"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/api/stats/cache')
+def get_cache_stats():
     return jsonify({
-        "candlestick": candles,
-        "sma5": sma5,
-        "sma20": sma20,
-        "rsi_base": rsi_base,
-        "rsi_avg": rsi_avg_line,
-        "signals": signals
+        "data_version": candle_store.data_version,
+        "indicators": indicator_cache.stats(),
+        "stream": live_stream.stats(),
+        "http": http_cache.stats(),
+        "replay": replay_feed.stats() if replay_feed is not None else None,
     })
 
 
 # -------------------- App entry --------------------
 if __name__ == '__main__':
-    Thread(target=refresh_cache_periodically, daemon=True).start()
+    candle_store.get()  # load once before serving
+    if REPLAY_SPEED:
+        replay_feed = HistoricalReplay(candle_store, speed=parse_speed(REPLAY_SPEED), start=REPLAY_FROM).start()
+        print(f"⏯️ Replaying monthly files from {REPLAY_FROM} at {REPLAY_SPEED}")
+    else:
+        Thread(target=refresh_cache_periodically, daemon=True).start()
+    if TAIL_FILE:
+        FileTailFeed(TAIL_FILE, candle_store).start()
+        print(f"📡 Tailing {TAIL_FILE} for live bars")
     print("🚀 Starting Flask server at http://127.0.0.1:5000")
     app.run(debug=True)
@@ -0,0 +1,156 @@
+import argparse
+import bisect
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from finalExcel import (
+    DATA_DIR, LOCAL_COMBINED, STOP_POINTS, TARGET_POINTS, ContractDataProvider, simulate_entry_rows,
+    strike_rows_from_entries, write_results,
+)
+from signals import compute_indicator_frame, find_entry_points
+from sweep import load_candles, warmup_start
+
+logger = logging.getLogger(__name__)
+
+RESULT_FILE = Path("backtest_results.parquet")
+EXPIRY_DIR = DATA_DIR / "desiquant" / "data" / "candles" / "NIFTY"  # one folder per expiry date
+MAX_EXPIRY_DAYS = 7  # weeklies: a later "nearest" expiry means the real one is missing from the data
+
+
+# -------------------- Expiry resolution --------------------
+def available_expiries(provider=None, expiry_dir=EXPIRY_DIR):
+    """
+    Sorted expiry dates found in the options data: the combined index, the
+    expiry folders on R2 (through the provider's mirror) and local folders.
+    """
+    found = set()
+    if provider is not None and provider.index is not None:
+        found.update(provider.index.expiries())
+    if provider is not None and provider.mirror is not None:
+        found.update(provider.mirror.expiries())
+    if Path(expiry_dir).is_dir():
+        for p in Path(expiry_dir).iterdir():
+            try:
+                found.add(pd.Timestamp(p.name).date())
+            except ValueError:
+                continue
+    return sorted(found)
+
+
+def nearest_expiry(day, expiries, max_days=MAX_EXPIRY_DAYS):
+    """
+    First known expiry on or after `day`, or None when there is none within
+    `max_days` (the week's expiry is not in the data; a far-month contract
+    would be the wrong one to trade).
+    """
+    day = pd.Timestamp(day).date()
+    i = bisect.bisect_left(expiries, day)
+    if i < len(expiries) and (expiries[i] - day).days <= max_days:
+        return expiries[i]
+    return None
+
+
+def group_entries(entries, expiries):
+    """{expiry: [(day, rows), ...]} with the strike rows of each entry day; days without an expiry are skipped."""
+    if entries.empty:
+        return {}
+    days = pd.to_datetime(entries["Time"]).dt.normalize()
+    groups, skipped = {}, []
+    for day, part in entries.groupby(days, sort=True):
+        rows, _ = strike_rows_from_entries(part)
+        if rows:
+            expiry = nearest_expiry(day, expiries)
+            if expiry is None:
+                skipped.append(day.strftime("%Y-%m-%d"))
+                continue
+            groups.setdefault(expiry, []).append((day.strftime("%Y-%m-%d"), rows))
+    if skipped:
+        logger.warning("No expiry within %d days for %d entry days, skipped: %s",
+                       MAX_EXPIRY_DAYS, len(skipped), ", ".join(skipped))
+    return groups
+
+
+# -------------------- Worker processes --------------------
+# Each worker keeps one provider for the whole run, so a contract is read
+# once per process no matter how many of its days that process handles.
+_provider = None
+
+
+def _init_worker(combined_path):
+    global _provider
+    _provider = ContractDataProvider(combined_path)
+
+
+def _run_expiry(task):
+    expiry, days, target_pts, stop_pts = task
+    expiry = pd.Timestamp(expiry).strftime("%Y-%m-%d")
+    results = []
+    for day, rows in days:
+        day_results, _ = simulate_entry_rows(rows, expiry, day, target_pts, stop_pts, _provider)
+        results.extend(day_results)
+    return results
+
+
+def run_backtest(start, end, target_pts=TARGET_POINTS, stop_pts=STOP_POINTS, rsi_period=9, rsi_avg=3,
+                 interval="1m", max_workers=None, combined_path=LOCAL_COMBINED, candles=None,
+                 out_file=RESULT_FILE):
+    """
+    Backtest every entry signal between `start` and `end` (inclusive dates).
+
+    Each entry day is matched to its nearest weekly expiry; work is grouped
+    by expiry (then day) and the expiries run in parallel worker processes.
+    Returns (results_df, counts) and saves the results to `out_file`.
+    """
+    t0 = time.perf_counter()
+    if candles is None:
+        candles = load_candles(interval, warmup_start(start, interval, rsi_period, rsi_avg),
+                               pd.Timestamp(end).normalize() + pd.Timedelta(days=1))
+    entries = find_entry_points(compute_indicator_frame(candles, rsi_period, rsi_avg), start, end)
+    provider = ContractDataProvider(combined_path)
+    expiries = available_expiries(provider)
+    groups = group_entries(entries, expiries)
+    tasks = [(expiry, days, target_pts, stop_pts) for expiry, days in sorted(groups.items())]
+    print(f"📅 {len(entries)} entries on {sum(len(d) for d in groups.values())} days across {len(tasks)} expiries")
+
+    workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(combined_path,)) as pool:
+            chunks = list(pool.map(_run_expiry, tasks))
+    else:
+        global _provider
+        _provider = provider  # in-process: reuse the index already read for the expiries
+        chunks = [_run_expiry(task) for task in tasks]
+
+    results = [r for chunk in chunks for r in chunk]
+    counts = {"target": 0, "stoploss": 0, "none": 0}
+    for r in results:
+        counts[r["outcome"]] = counts.get(r["outcome"], 0) + 1
+    out_df = pd.DataFrame(results)
+    if results:
+        out_df = write_results(out_df, out_file)
+        print(f"Saved results to {out_file}. Summary: targets={counts['target']}, "
+              f"stoplosses={counts['stoploss']}, none={counts['none']}")
+    else:
+        print("No results to save.")
+    logger.info("Backtest %s → %s took %.1fs with %d workers", start, end, time.perf_counter() - t0, workers)
+    return out_df, counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest NIFTY entry signals over a date range.")
+    parser.add_argument("start", help="first entry day, e.g. 2023-01-01")
+    parser.add_argument("end", help="last entry day, e.g. 2023-12-31")
+    parser.add_argument("--target", type=float, default=TARGET_POINTS)
+    parser.add_argument("--stop", type=float, default=STOP_POINTS)
+    parser.add_argument("--rsi-period", type=int, default=9)
+    parser.add_argument("--rsi-avg", type=int, default=3)
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    run_backtest(args.start, args.end, args.target, args.stop, args.rsi_period, args.rsi_avg,
+                 args.interval, args.workers)
@@ -0,0 +1,428 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Chart intervals → pandas resample frequency
+INTERVAL_MAP = {
+    "1m": "1min", "3m": "3min", "5m": "5min", "10m": "10min",
+    "15m": "15min", "30m": "30min", "1h": "1h", "2h": "2h",
+    "4h": "4h", "1d": "1D"
+}
+
+# Each pyramid level is aggregated from the finer level it nests into,
+# never from raw minutes. Parents are listed before their children.
+PYRAMID_PARENT = {
+    "1m": None, "3m": "1m", "5m": "1m", "10m": "5m", "15m": "5m",
+    "30m": "15m", "1h": "30m", "2h": "1h", "4h": "2h", "1d": "4h"
+}
+
+OHLC_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last"}
+
+CHANGE_HISTORY = 4096  # appends remembered for extending indicator series
+
+
+def _is_clean_minute_frame(frame):
+    """True when the frame already is its own 1m resample (minute stamps, no gaps in values)."""
+    idx = frame.index
+    return (
+        isinstance(idx, pd.DatetimeIndex)
+        and idx.is_monotonic_increasing
+        and idx.is_unique
+        and not (idx.asi8 % 60_000_000_000).any()
+        and not frame.isna().to_numpy().any()
+    )
+
+
+def build_resample_pyramid(frame):
+    """Pre-aggregate every chart interval from a sorted 1-minute OHLC frame."""
+    levels = {}
+    for interval, parent in PYRAMID_PARENT.items():
+        if parent is None and _is_clean_minute_frame(frame):
+            # reuse the base frame (and its memory-mapped buffers) as-is
+            levels[interval] = frame
+            continue
+        source = frame if parent is None else levels[parent]
+        levels[interval] = source.resample(INTERVAL_MAP[interval]).agg(OHLC_AGG).dropna()
+    return levels
+
+
+def _aggregate_sorted(times, values, step):
+    """
+    OHLC bars of sorted, NaN-free epoch-ns `times` / [n, 4] `values` per
+    `step`-ns bucket, as resample(...).agg(OHLC_AGG).dropna() would give
+    them, without resample's fixed per-call cost on a short live tail.
+    """
+    keys = times // step * step
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.zeros(0, dtype=np.intp)
+    if not len(starts):
+        return keys, values[:0]
+    ends = np.r_[starts[1:], len(keys)] - 1
+    out = np.column_stack([
+        values[starts, 0],
+        np.maximum.reduceat(values[:, 1], starts),
+        np.minimum.reduceat(values[:, 2], starts),
+        values[ends, 3],
+    ])
+    return keys[starts], out
+
+
+def _frame(times, values, like):
+    index = pd.DatetimeIndex(times.view("datetime64[ns]"), name=like.index.name)
+    return pd.DataFrame(values, index=index, columns=like.columns, copy=False)
+
+
+def extend_resample_pyramid(levels, previous, frame, changed_from):
+    """
+    Pyramid for `frame`, given the `levels` built from `previous`, a frame
+    that matches it before the timestamp `changed_from`. Each level keeps
+    its rows before the bucket holding changed_from and re-aggregates only
+    from there on (bucket edges divide the day, as resample's do).
+    """
+    out, arrays = {}, {}
+    for interval, parent in PYRAMID_PARENT.items():
+        old = levels[interval]
+        step = pd.Timedelta(INTERVAL_MAP[interval]).value
+        bucket = changed_from.value // step * step
+        if parent is None:
+            times, values = frame.index.asi8, frame.to_numpy()
+        else:
+            times, values = arrays[parent]
+        start = np.searchsorted(times, bucket)
+        tail_times, tail_values = times[start:], values[start:]
+        if np.isnan(tail_values).any():
+            # NaN bars only come in through the base frame: resample handles them
+            level = (frame if parent is None else out[parent]).iloc[start:].resample(INTERVAL_MAP[interval]).agg(OHLC_AGG).dropna()
+            tail_times, tail_values = level.index.asi8, level.to_numpy(dtype=values.dtype)
+        elif parent is None and old is previous and not (tail_times % step).any():
+            out[interval], arrays[interval] = frame, (times, values)  # still its own 1m resample
+            continue
+        else:
+            tail_times, tail_values = _aggregate_sorted(tail_times, tail_values, step)
+        keep = np.searchsorted(old.index.asi8, bucket)
+        times = np.concatenate([old.index.asi8[:keep], tail_times])
+        values = np.concatenate([old.to_numpy()[:keep], tail_values.astype(old.dtypes.iloc[0], copy=False)])
+        out[interval], arrays[interval] = _frame(times, values, old), (times, values)
+    return out
+
+
+# -------------------- Memory-mapped OHLC binary --------------------
+# Fixed layout shared read-only by every worker process:
+#   header  : magic (8 bytes) | rows (int64) | float itemsize (int64)
+#   times   : int64[rows]      epoch nanoseconds, sorted
+#   ohlc    : float[rows, 4]   row-major Open, High, Low, Close
+# The OHLC block maps straight onto a DataFrame block, so a mapped frame
+# holds no private copy of the candles; pages live in the OS page cache.
+# Files are named by a hash of their content, so every worker holding the
+# same candles maps the same file (and inode) and shares its pages.
+MMAP_MAGIC = b"NIFTYOHL"
+MMAP_HEADER = np.dtype([("magic", "S8"), ("rows", "<i8"), ("itemsize", "<i8")])
+
+
+def _ohlc_arrays(frame, float_dtype):
+    float_dtype = np.dtype(float_dtype).newbyteorder("<")
+    times = frame.index.values.astype("datetime64[ns]").astype("<i8")
+    ohlc = np.ascontiguousarray(frame[list(OHLC_AGG)].to_numpy(dtype=float_dtype))
+    header = np.array([(MMAP_MAGIC, len(frame), float_dtype.itemsize)], dtype=MMAP_HEADER)
+    return header, times, ohlc
+
+
+def ohlc_binary_path(frame, base_path, float_dtype=np.float64):
+    """<stem>-<content hash><suffix> next to base_path for this frame's candles."""
+    base_path = Path(base_path)
+    digest = hashlib.sha1()
+    for part in _ohlc_arrays(frame, float_dtype):
+        digest.update(part.tobytes())
+    return base_path.with_name(f"{base_path.stem}-{digest.hexdigest()[:16]}{base_path.suffix}")
+
+
+def write_ohlc_binary(frame, path, float_dtype=np.float64):
+    """
+    Persist a Datetime-indexed OHLC frame in the fixed mmap layout.
+
+    The data goes to a unique temp file that is then hard-linked into
+    place, so a reader never sees a partial file and, when several
+    processes race to publish the same path, exactly one file wins; the
+    others leave it alone. Returns True when this call created `path`.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for part in _ohlc_arrays(frame, float_dtype):
+                part.tofile(f)
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            return False
+        return True
+    finally:
+        os.unlink(tmp)
+
+
+def shared_ohlc_frame(frame, base_path, float_dtype=np.float64):
+    """
+    Read-only mapped copy of `frame`, shared by every process publishing the
+    same candles: the first one writes the content-addressed binary, the
+    rest map the existing file. Older binaries next to it are removed
+    (workers that still map them keep their pages until they move on).
+    """
+    path = ohlc_binary_path(frame, base_path, float_dtype)
+    for attempt in range(3):
+        if not path.exists():
+            write_ohlc_binary(frame, path, float_dtype)
+        try:
+            mapped = map_ohlc_binary(path)
+            break
+        except FileNotFoundError:
+            # pruned by a process publishing newer candles in between
+            if attempt == 2:
+                raise
+    for old in path.parent.glob(f"{Path(base_path).stem}-*{Path(base_path).suffix}"):
+        if old != path:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+    return mapped
+
+
+def map_ohlc_binary(path):
+    """Map an OHLC binary read-only and wrap it as a DataFrame without copying."""
+    header = np.fromfile(path, dtype=MMAP_HEADER, count=1)[0]
+    if header["magic"] != MMAP_MAGIC:
+        raise ValueError(f"{path} is not an OHLC binary")
+    rows = int(header["rows"])
+    float_dtype = np.dtype(f"<f{int(header['itemsize'])}")
+    offset = MMAP_HEADER.itemsize
+
+    times = np.memmap(path, dtype="<i8", mode="r", offset=offset, shape=(rows,))
+    ohlc = np.memmap(path, dtype=float_dtype, mode="r", offset=offset + 8 * rows, shape=(rows, 4))
+    index = pd.DatetimeIndex(times.view("datetime64[ns]"), name="Datetime", copy=False)
+    return pd.DataFrame(ohlc, index=index, columns=list(OHLC_AGG), copy=False)
+
+
+# -------------------- Content version --------------------
+# data_version names the candles themselves, so every worker serving the
+# same bars reports (and tags responses with) the same value. It is a sum of
+# per-row hashes mod 2**64: order-free, so a tail of bars can be swapped by
+# subtracting the old rows' hashes and adding the new ones.
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix64(x):
+    x = x ^ (x >> np.uint64(30))
+    x = x * _MIX1
+    x = x ^ (x >> np.uint64(27))
+    x = x * _MIX2
+    return x ^ (x >> np.uint64(31))
+
+
+def row_hash_sum(frame):
+    """Sum (mod 2**64) of a hash of each (time, Open, High, Low, Close) row."""
+    if len(frame) == 0:
+        return 0
+    h = _mix64(frame.index.asi8.view(np.uint64) + _GOLDEN)
+    values = np.ascontiguousarray(frame[list(OHLC_AGG)].to_numpy(dtype=np.float64)).view(np.uint64)
+    for col in range(values.shape[1]):
+        h = _mix64(h ^ (values[:, col] + _GOLDEN))
+    return int(h.sum(dtype=np.uint64))
+
+
+def format_data_version(hash_sum):
+    return f"{hash_sum:016x}"
+
+
+class CandleSnapshot:
+    """
+    Immutable view of the combined 1-minute candles at one data version.
+
+    `version` counts publishes in this process (it orders snapshots for
+    caches and waiters); `data_version` is derived from the candles, equal in
+    every process that serves the same bars, and is what clients and ETags
+    see. `changes` lists (version, first changed bar) for the appends since
+    the last full publish, shared by the snapshots built from it.
+    """
+
+    __slots__ = ("frame", "levels", "version", "loaded_at", "hash_sum", "changes")
+
+    def __init__(self, frame, levels, version, loaded_at, hash_sum=0, changes=None):
+        self.frame = frame
+        self.levels = levels
+        self.version = version
+        self.loaded_at = loaded_at
+        self.hash_sum = hash_sum
+        self.changes = changes if changes is not None else [(version, None)]
+
+    @property
+    def data_version(self):
+        return format_data_version(self.hash_sum)
+
+    def level(self, interval):
+        """Pre-aggregated OHLC frame for an interval (unknown intervals fall back to 1m)."""
+        return self.levels.get(interval, self.levels["1m"])
+
+    def changed_since(self, version):
+        """
+        Earliest bar time that may differ from snapshot `version`, or None
+        when that is not known (a full publish in between, or too long ago).
+        """
+        first = self.changes[0][0]
+        if version is None or not first <= version < self.version:
+            return None
+        return min(t for _, t in self.changes[version - first + 1: self.version - first + 1])
+
+    def stable_rows(self, interval, version):
+        """Leading rows of level(interval) unchanged since snapshot `version` (None when unknown)."""
+        if version is not None and version == self.version:
+            return len(self.level(interval))
+        changed = self.changed_since(version)
+        if changed is None:
+            return None
+        freq = INTERVAL_MAP[interval if interval in self.levels else "1m"]
+        return int(self.level(interval).index.searchsorted(changed.floor(freq)))
+
+
+class CandleStore:
+    """
+    Process-wide resident store for the combined NIFTY candles.
+
+    The frame is indexed by Datetime and sorted once when it is published.
+    Readers grab the current snapshot reference without locking; a refresh
+    builds the new snapshot off to the side and swaps the reference in one
+    assignment, so readers see either the old or the new frame, never a
+    half-built one. Readers must treat snapshot.frame as read-only.
+
+    `loader()` returns (frame, source): the candles and the on-disk store
+    version they were read at, which refreshers compare to spot newer data.
+
+    With mmap_path set, each published frame is served from a read-only
+    memory map of a content-addressed OHLC binary next to that path, so
+    several worker processes share one copy of the candles.
+    """
+
+    def __init__(self, loader, mmap_path=None, float_dtype=np.float64):
+        self._loader = loader
+        self._mmap_path = mmap_path
+        self._float_dtype = float_dtype
+        self._snapshot = None
+        self._version = 0
+        self._source = None
+        self._write_lock = threading.Lock()  # serialises publishers only
+        self._published = threading.Condition()  # wakes wait_for_version()
+
+    def get(self):
+        snap = self._snapshot
+        if snap is None:
+            # cold start: first caller loads, concurrent callers wait for it
+            with self._write_lock:
+                if self._snapshot is None:
+                    frame, self._source = self._loader()
+                    self._publish_locked(frame)
+            snap = self._snapshot
+        return snap
+
+    @property
+    def version(self):
+        snap = self._snapshot
+        return snap.version if snap is not None else 0
+
+    @property
+    def data_version(self):
+        snap = self._snapshot
+        return snap.data_version if snap is not None else None
+
+    @property
+    def source(self):
+        """On-disk store version the current frame was read at (None before the first load)."""
+        return self._source
+
+    def publish(self, df, source=None):
+        """
+        Index, sort and atomically swap in a freshly built frame read at
+        store version `source`. Candles identical to the current ones keep
+        the current snapshot (and every cache built on it).
+        """
+        with self._write_lock:
+            self._source = source
+            return self._publish_locked(df)
+
+    def append(self, bars):
+        """
+        Publish the current frame plus new 1m bars (Datetime index or column).
+        Bars at or after the first new timestamp are replaced, so a still-
+        forming bar can be sent again as it updates.
+
+        Only the replaced tail is hashed and only the pyramid buckets from the
+        first new bar on are re-aggregated. Appended frames live in process
+        memory: the shared OHLC binary is left as it is until the next full
+        publish.
+        """
+        if "Datetime" in bars.columns:
+            bars = bars.set_index("Datetime")
+        bars = bars.sort_index()[list(OHLC_AGG)]
+        bars = bars[~bars.index.duplicated(keep="first")]
+        if bars.empty:
+            return self.get()
+        self.get()  # make sure there is a base frame to append to
+        with self._write_lock:
+            snap = self._snapshot
+            frame = snap.frame
+            bars = bars.astype(frame.dtypes.to_dict())  # the values a full publish would serve
+            changed_from = bars.index[0]
+            cut = frame.index.searchsorted(changed_from, side="left")
+            hash_sum = (snap.hash_sum - row_hash_sum(frame.iloc[cut:]) + row_hash_sum(bars)) % (1 << 64)
+            if hash_sum == snap.hash_sum and len(frame) == cut + len(bars):
+                return snap  # a bar sent again unchanged
+            new_frame = _frame(
+                np.concatenate([frame.index.asi8[:cut], bars.index.asi8]),
+                np.concatenate([frame.to_numpy()[:cut], bars.to_numpy()]),
+                frame,
+            )
+            levels = extend_resample_pyramid(snap.levels, frame, new_frame, changed_from)
+            changes = snap.changes
+            if len(changes) >= CHANGE_HISTORY:
+                changes = None  # older series fall back to a full comparison
+            return self._swap_locked(new_frame, levels, hash_sum, changes, changed_from)
+
+    def wait_for_version(self, version, timeout=None):
+        """Block until a snapshot newer than `version` is published (or timeout); returns the current one."""
+        with self._published:
+            self._published.wait_for(lambda: self.version > version, timeout=timeout)
+        return self._snapshot
+
+    def _publish_locked(self, df):
+        frame = df
+        if "Datetime" in frame.columns:
+            frame = frame.set_index("Datetime")
+        frame = frame.sort_index()
+        frame = frame[~frame.index.duplicated(keep="first")]
+        if list(frame.columns) != list(OHLC_AGG):
+            frame = frame[list(OHLC_AGG)]
+        if self._mmap_path is not None:
+            # serve the published frame from the shared read-only mapping
+            frame = shared_ohlc_frame(frame, self._mmap_path, self._float_dtype)
+        hash_sum = row_hash_sum(frame)
+        current = self._snapshot
+        if current is not None and current.hash_sum == hash_sum and len(current.frame) == len(frame):
+            # same candles (e.g. another worker already ingested): keep caches warm
+            return current
+        return self._swap_locked(frame, build_resample_pyramid(frame), hash_sum)
+
+    def _swap_locked(self, frame, levels, hash_sum, changes=None, changed_from=None):
+        self._version += 1
+        if changes is not None:
+            changes.append((self._version, changed_from))
+        snap = CandleSnapshot(frame, levels, self._version, time.time(), hash_sum, changes)
+        self._snapshot = snap
+        with self._published:
+            self._published.notify_all()
+        return snap
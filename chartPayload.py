@@ -0,0 +1,127 @@
+import base64
+import json
+
+import numpy as np
+
+SIGNAL_MARKERS = {
+    "buy": {"position": "aboveBar", "color": "green", "shape": "arrowUp", "text": "Buy"},
+    "sell": {"position": "aboveBar", "color": "red", "shape": "arrowDown", "text": "Sell"},
+}
+
+
+def epoch_seconds(index):
+    """DatetimeIndex → list of int epoch seconds (tz-naive treated as UTC)."""
+    return index.values.astype("datetime64[s]").astype(np.int64).tolist()
+
+
+def _column(df, col):
+    return df[col].to_numpy(dtype=np.float64)
+
+
+def candle_records(times, df):
+    """[{time, open, high, low, close}, ...] built from column arrays in one pass."""
+    return [
+        {"time": t, "open": o, "high": h, "low": l, "close": c}
+        for t, o, h, l, c in zip(
+            times,
+            _column(df, "Open").tolist(),
+            _column(df, "High").tolist(),
+            _column(df, "Low").tolist(),
+            _column(df, "Close").tolist(),
+        )
+    ]
+
+
+def line_records(times, values, fill=None):
+    """
+    [{time, value}, ...] for a line series. NaN points are dropped, or
+    replaced by `fill` when one is given.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    nan = np.isnan(values)
+    if fill is None:
+        keep = ~nan
+        return [{"time": t, "value": v} for t, v in zip(np.asarray(times)[keep].tolist(), values[keep].tolist())]
+    values = np.where(nan, fill, values)
+    return [{"time": t, "value": v} for t, v in zip(times, values.tolist())]
+
+
+def signal_records(times, signals):
+    """Lightweight-charts markers for rows whose Signal is buy/sell."""
+    signals = np.asarray(signals, dtype=object)
+    out = []
+    for i in np.flatnonzero((signals == "buy") | (signals == "sell")).tolist():
+        marker = {"time": times[i]}
+        marker.update(SIGNAL_MARKERS[signals[i]])
+        out.append(marker)
+    return out
+
+
+def nullable(values, fill=None):
+    """Float array → JSON-safe list with NaN as `fill` (None → null)."""
+    values = np.asarray(values, dtype=np.float64)
+    nan = np.isnan(values)
+    if not nan.any():
+        return values.tolist()
+    if fill is not None:
+        return np.where(nan, fill, values).tolist()
+    out = values.astype(object)
+    out[nan] = None
+    return out.tolist()
+
+
+def columnar_payload(df):
+    """
+    Compact chart payload: one shared `time` array plus parallel value
+    arrays. Missing SMA points are null; missing RSI points are 0 to match
+    the row format.
+    """
+    times = epoch_seconds(df.index)
+    return {
+        "format": "columnar",
+        "time": times,
+        "open": nullable(_column(df, "Open")),
+        "high": nullable(_column(df, "High")),
+        "low": nullable(_column(df, "Low")),
+        "close": nullable(_column(df, "Close")),
+        "sma5": nullable(_column(df, "SMA_5")),
+        "sma20": nullable(_column(df, "SMA_20")),
+        "rsi_base": nullable(_column(df, "RSI_Base"), fill=0),
+        "rsi_avg": nullable(_column(df, "RSI_Avg"), fill=0),
+        "signals": signal_records(times, df["Signal"].to_numpy()) if "Signal" in df.columns else [],
+    }
+
+
+# -------------------- Cursor pagination --------------------
+def encode_cursor(interval, before):
+    """Opaque cursor for the page of `interval` bars strictly before epoch second `before`."""
+    raw = json.dumps({"i": interval, "b": int(before)}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """(interval, before) from a cursor; raises ValueError on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        return data["i"], int(data["b"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"invalid cursor: {token!r}") from e
+
+
+def page_bounds(index, before=None, limit=1000):
+    """
+    (start, stop) positions of the `limit` bars before epoch second `before`
+    in a sorted DatetimeIndex, found by binary search instead of a mask.
+    """
+    stop = len(index)
+    if before is not None:
+        cutoff = np.datetime64(int(before), "s").astype(index.dtype)
+        stop = int(index.searchsorted(cutoff, side="left"))
+    return max(0, stop - max(int(limit), 0)), stop
+
+
+def since_start(index, since):
+    """First position in a sorted DatetimeIndex at or after epoch second `since`."""
+    cutoff = np.datetime64(int(since), "s").astype(index.dtype)
+    return int(index.searchsorted(cutoff, side="left"))
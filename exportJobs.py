@@ -0,0 +1,164 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class ExportJob:
+    """State of one background export, as reported by the job-status endpoint."""
+
+    def __init__(self, job_id, params, group=None, seq=0):
+        self.id = job_id
+        self.params = params
+        self.group = group
+        self.seq = seq  # submission order, to tell newer jobs of a group from older ones
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.rows = None
+        self.path = None
+        self.files = []  # everything this job wrote; path is the first of them
+        self.error = None
+        self.superseded_by = None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "group": self.group,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "rows": self.rows,
+            "path": str(self.path) if self.path else None,
+            "files": [str(f) for f in self.files],
+            "error": self.error,
+            "superseded_by": self.superseded_by,
+        }
+
+
+def publish_latest(src, dest):
+    """Atomically copy a finished job's file to the fixed 'latest' path readers use."""
+    write_atomic(dest, lambda tmp: shutil.copyfile(src, tmp))
+    return Path(dest)
+
+
+def write_atomic(path, write):
+    """Write via a temp file in the same folder, then rename over `path`."""
+    path = Path(path)
+    # keep the real suffix last so writers that infer the format from it still work
+    tmp = path.with_name(f".{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp{path.suffix}")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+class ExportJobQueue:
+    """
+    Bounded background pool for slow exports (openpyxl writes).
+
+    Jobs are deduplicated by their parameters: submitting the same params
+    again returns the queued, running or finished job instead of starting
+    another one. Failed and superseded jobs are rerun on the next submit.
+    Only the most recent `keep` jobs are remembered; the files of a
+    forgotten job are deleted with it.
+
+    Jobs may share a `group` (e.g. the same parameters at another data
+    version). Only the newest finished job of a group keeps its files; an
+    older one's are deleted and it reports the job that superseded it.
+    """
+
+    def __init__(self, max_workers=2, keep=200):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._jobs = OrderedDict()
+        self._keep = keep
+        self._latest = {}  # group -> finished job holding the group's files
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def job_id(params):
+        raw = repr(sorted(params.items())).encode()
+        return hashlib.sha1(raw).hexdigest()[:16]
+
+    def submit(self, params, func, group=None):
+        """
+        Queue func(job_id) -> (rows, files) unless an equivalent job already
+        exists. Each job writes its own files (named after job_id), so one
+        job's result is never overwritten by another's.
+        """
+        job_id = self.job_id(params)
+        evicted = []
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != FAILED and job.superseded_by is None:
+                return job
+            self._seq += 1
+            job = ExportJob(job_id, params, group, self._seq)
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            while len(self._jobs) > self._keep:
+                old = self._jobs.popitem(last=False)[1]
+                if self._latest.get(old.group) is old:
+                    del self._latest[old.group]
+                evicted.append(old)
+        for old in evicted:
+            self._remove_files(old.files)
+        self._pool.submit(self._run, job, func)
+        return job
+
+    @staticmethod
+    def _remove_files(files):
+        for f in files:
+            try:
+                Path(f).unlink()
+            except OSError:
+                pass
+
+    def _run(self, job, func):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.rows, files = func(job.id)
+            job.files = [Path(f) for f in files]
+            job.path = job.files[0] if job.files else None
+            self._supersede(job)  # before DONE: pollers never see the older files
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def _supersede(self, job):
+        """Keep the files of the newest finished job in job's group, delete the other's."""
+        if job.group is None:
+            return
+        with self._lock:
+            current = self._latest.get(job.group)
+            if current is None or current.seq < job.seq:
+                self._latest[job.group] = job
+                stale, newer = current, job
+            else:  # a newer job of the group finished first
+                stale, newer = job, current
+            if stale is None or stale is newer:
+                return
+            stale.superseded_by = newer.id
+            stale_files = [f for f in stale.files if f not in newer.files]
+            stale.files, stale.path = [], None
+        self._remove_files(stale_files)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
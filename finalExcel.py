@@ -3,14 +3,28 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
-import re
 import logging
+from collections import OrderedDict
+
+from optionsIndex import OptionsIndex
+from r2Mirror import R2Mirror, contract_file_names
+from signals import read_entry_points
+from tradeSim import simulate_trades
 
 # Config / easy variables
 DATA_DIR = Path("data")
 LOCAL_COMBINED = DATA_DIR / "nifty_options_2023_12.parquet"
-ENTRY_FILE = Path("entrypoints.xlsx")
-OUTPUT_FILE = Path("finalExceloutput.xlsx")
+ENTRY_FILE = Path("entrypoints.parquet")  # typed hand-off from the chart app
+ENTRY_EXCEL_FILE = Path("entrypoints.xlsx")  # older runs
+OUTPUT_FILE = Path("finalExceloutput.parquet")
+OUTPUT_EXCEL_FILE = Path("finalExceloutput.xlsx")  # optional report
+
+# Typed schema of the backtest results
+RESULT_DTYPES = {
+    "strike": "int64", "type": "category", "expiry": "category", "day": "category",
+    "buy_candle_ts": "datetime64[ns]", "buy_price": "float64", "target_price": "float64",
+    "stop_price": "float64", "outcome": "category", "hit_time": "datetime64[ns]",
+}
 
 # TARGET / STOP (change these numbers to adjust strategy)
 TARGET_POINTS = 20
@@ -58,94 +72,22 @@ def _ensure_datetime_index(df):
     except Exception:
         return None
 
-def _match_symbol_like(colval, strike, opt_type):
-    """Return True if column value likely refers to strike+type (handles '21400CE', '21400 CE', etc)."""
-    if pd.isna(colval):
-        return False
-    s = str(colval).upper().replace("-", " ").replace("_", " ")
-    # look for patterns "21400CE" or "21400 CE" or "21400 CE.NFO" etc
-    patterns = [
-        rf"\b{strike}\s*{opt_type}\b",
-        rf"\b{strike}{opt_type}\b",
-        rf"\b{strike}\b.*\b{opt_type}\b",
-        rf"\b{strike}\b"
-    ]
-    for p in patterns:
-        if re.search(p, s):
-            return True
-    return False
-
-def _filter_combined_for_strike(df, strike, opt_type, expiry_date):
-    """
-    Try several heuristics to filter the combined parquet for the specific strike/type/expiry.
-    Returns subset DataFrame or None.
-    """
-    df2 = _ensure_datetime_index(df)
-    if df2 is None:
-        logger.debug("Combined DF has no datetime index/column")
+def _lookup_contract(index, strike, opt_type, expiry_date):
+    sub = index.lookup(strike, opt_type, expiry_date)
+    if sub is None or sub.empty:
+        logger.info("No matching rows found in combined file for %s%s expiry %s", strike, opt_type, expiry_date)
         return None
-
-    cols = {c.lower(): c for c in df2.columns}
-    logger.info("Combined file columns: %s", list(df2.columns)[:50])
-
-    # 1) Symbol-like columns
-    for candidate in ["symbol", "ticker", "instrument", "name"]:
-        if candidate in cols:
-            col = cols[candidate]
-            mask = df2[col].astype(str).apply(lambda v: _match_symbol_like(v, strike, opt_type))
-            sub = df2[mask]
-            if not sub.empty:
-                # try to filter expiry if expiry column present
-                if "expiry" in cols:
-                    try:
-                        exp_col = cols["expiry"]
-                        sub = sub[pd.to_datetime(sub[exp_col]).dt.date == pd.to_datetime(expiry_date).date()]
-                    except Exception:
-                        pass
-                logger.info("Matched via %s column, rows=%d", col, len(sub))
-                return sub
-
-    # 2) Explicit strike / option type columns
-    strike_col = None
-    optcol = None
-    for c_lower, c in cols.items():
-        if "strike" in c_lower:
-            strike_col = c
-        if any(x in c_lower for x in ("optiontype", "optype", "type", "opt_type")):
-            optcol = c
-    if strike_col:
-        mask = (pd.to_numeric(df2[strike_col], errors="coerce") == strike)
-        if optcol:
-            mask = mask & df2[optcol].astype(str).str.upper().str.contains(opt_type.upper())
-        if "expiry" in cols:
-            try:
-                exp_col = cols["expiry"]
-                mask = mask & (pd.to_datetime(df2[exp_col]).dt.date == pd.to_datetime(expiry_date).date())
-            except Exception:
-                pass
-        sub = df2[mask]
-        if not sub.empty:
-            logger.info("Matched via strike/option columns, rows=%d", len(sub))
-            return sub
-
-    # 3) If none matched, attempt to parse symbol-like values from all string columns (last resort)
-    string_cols = [c for c in df2.columns if df2[c].dtype == object]
-    for col in string_cols:
-        mask = df2[col].astype(str).apply(lambda v: _match_symbol_like(v, strike, opt_type))
-        sub = df2[mask]
-        if not sub.empty:
-            logger.info("Matched via generic string column %s, rows=%d", col, len(sub))
-            # try expiry filter
-            if "expiry" in cols:
-                try:
-                    exp_col = cols["expiry"]
-                    sub = sub[pd.to_datetime(sub[exp_col]).dt.date == pd.to_datetime(expiry_date).date()]
-                except Exception:
-                    pass
-            return sub
-
-    logger.info("No matching rows found in combined file for %s%s expiry %s", strike, opt_type, expiry_date)
-    return None
+    logger.info("Matched %s%s expiry %s in options index, rows=%d", strike, opt_type, expiry_date, len(sub))
+    return sub
+
+def load_combined_index(path=LOCAL_COMBINED):
+    """Read the combined parquet and index it; None if it has no contract columns."""
+    df_all = pd.read_parquet(path)
+    logger.info("Loaded combined parquet, rows=%d", len(df_all))
+    index = OptionsIndex.from_frame(df_all)
+    if index is None:
+        logger.info("Combined file has no contract columns: %s", list(df_all.columns)[:50])
+    return index
 
 # S3 storage options (used when local file not present)
 S3_STORAGE_OPTIONS = {
@@ -156,32 +98,38 @@ S3_STORAGE_OPTIONS = {
 }
 S3_PREFIX = "desiquant/data/candles/NIFTY"
 
-def _read_parquet_s3(path):
-    """Read parquet from the R2 S3 bucket path (path without s3://)."""
-    uri = path if path.startswith("s3://") else f"s3://{path}"
+def build_r2_mirror(max_workers=8):
+    """R2Mirror over the bucket (files land under data/), or None without s3fs."""
     try:
-        df = pd.read_parquet(uri, storage_options=S3_STORAGE_OPTIONS)
-        return df
-    except Exception as e:
-        logger.debug("Failed to read s3 path %s : %s", uri, e)
+        import s3fs
+    except ImportError:
+        logger.info("s3fs not installed; R2 fallback disabled")
         return None
+    fs = s3fs.S3FileSystem(key=S3_STORAGE_OPTIONS["key"], secret=S3_STORAGE_OPTIONS["secret"],
+                           client_kwargs=S3_STORAGE_OPTIONS["client_kwargs"])
+    return R2Mirror(fs, S3_PREFIX, root=DATA_DIR, max_workers=max_workers)
+
+def local_strike_files(strike, opt_type, expiry_date):
+    """Per-strike parquet paths checked locally (mirrored R2 files included)."""
+    expiry_dir = DATA_DIR / "desiquant" / "data" / "candles" / "NIFTY" / expiry_date
+    return [
+        *(expiry_dir / name for name in contract_file_names(strike, opt_type)),
+        DATA_DIR / f"{expiry_date}_{strike}{opt_type}.parquet",
+        DATA_DIR / f"{strike}{opt_type}.parquet",
+    ]
 
-def load_strike_data_local(strike: int, opt_type: str, expiry_date="2023-12-28"):
+def load_strike_data_local(strike: int, opt_type: str, expiry_date="2023-12-28", combined_index=None, mirror=None):
     """
     Load data for a single strike/type.
     Order:
       1) try local per-strike parquet under data/
-      2) try combined LOCAL_COMBINED
-      3) try S3 per-strike parquet under the provided R2 bucket
+      2) try combined LOCAL_COMBINED (pass combined_index to reuse an index
+         already built for this run, False when it is known to have none)
+      3) mirror the per-strike parquet from the R2 bucket into data/ (pass
+         mirror to reuse one folder listing across strikes, False to skip R2)
     """
     # 1) local per-file candidates (unchanged)
-    filename_candidates = [
-        DATA_DIR / "desiquant" / "data" / "candles" / "NIFTY" / expiry_date / f"{strike}{opt_type}.parquet",
-        DATA_DIR / "desiquant" / "data" / "candles" / "NIFTY" / expiry_date / f"{strike}{opt_type}.parquet.gz",
-        DATA_DIR / f"{expiry_date}_{strike}{opt_type}.parquet",
-        DATA_DIR / f"{strike}{opt_type}.parquet",
-    ]
-    for p in filename_candidates:
+    for p in local_strike_files(strike, opt_type, expiry_date):
         if p.exists():
             try:
                 df = pd.read_parquet(p)
@@ -192,55 +140,28 @@ def load_strike_data_local(strike: int, opt_type: str, expiry_date="2023-12-28")
             except Exception as e:
                 logger.debug("Failed to read local %s : %s", p, e)
 
-    # 2) try combined local file
+    # 2) try combined local file (indexed once, then O(log n) per contract)
     if LOCAL_COMBINED.exists():
         try:
-            df_all = pd.read_parquet(LOCAL_COMBINED)
-            logger.info("Loaded combined parquet, rows=%d", len(df_all))
-            sub = _filter_combined_for_strike(df_all, strike, opt_type, expiry_date)
-            if sub is not None and not sub.empty:
-                return _ensure_datetime_index(sub)
+            index = combined_index if combined_index is not None else load_combined_index(LOCAL_COMBINED)
+            sub = _lookup_contract(index, strike, opt_type, expiry_date) if index is not None and index is not False else None
+            if sub is not None:
+                return sub
         except Exception as e:
             logger.exception("Error reading combined parquet: %s", e)
 
-    # 3) Try reading directly from S3 R2 per-strike path
-    s3_candidates = [
-        f"{S3_PREFIX}/{expiry_date}/{strike}{opt_type}.parquet.gz",
-        f"{S3_PREFIX}/{expiry_date}/{strike}{opt_type}.parquet",
-        # sometimes filenames include a space or suffix
-        f"{S3_PREFIX}/{expiry_date}/{strike} {opt_type}.parquet.gz",
-        f"{S3_PREFIX}/{expiry_date}/{strike} {opt_type}.parquet",
-    ]
-    for s3p in s3_candidates:
-        df = _read_parquet_s3(s3p)
-        if df is not None:
-            df = _ensure_datetime_index(df)
-            if df is not None:
-                logger.info("Loaded from S3 %s rows=%d", s3p, len(df))
-                return df
-
-    # 4) As a last resort, try scanning the expiry folder on S3 and match by symbol-like values
-    try:
-        fs = s3fs.S3FileSystem(key=S3_STORAGE_OPTIONS["key"], secret=S3_STORAGE_OPTIONS["secret"],
-                               client_kwargs={"endpoint_url": S3_STORAGE_OPTIONS["client_kwargs"]["endpoint_url"]})
-        prefix = f"{S3_PREFIX}/{expiry_date}/"
-        try:
-            files = fs.ls(prefix)
-        except Exception:
-            files = []
-        for f in files:
-            if not (f.endswith(".parquet") or f.endswith(".parquet.gz")):
-                continue
-            # quick heuristic: filename contains strike
-            if str(strike) in f and opt_type.upper() in f.upper():
-                df = _read_parquet_s3(f)
+    # 3) R2: resolved against one listing of the expiry folder, downloaded once
+    mirror = mirror if mirror is not None else build_r2_mirror()
+    if mirror:
+        p = mirror.ensure(strike, opt_type, expiry_date)
+        if p is not None:
+            try:
+                df = _ensure_datetime_index(pd.read_parquet(p))
                 if df is not None:
-                    df = _ensure_datetime_index(df)
-                    if df is not None:
-                        logger.info("Loaded candidate from S3 %s", f)
-                        return df
-    except Exception as e:
-        logger.debug("S3 folder scan failed: %s", e)
+                    logger.info("Loaded mirrored R2 file %s rows=%d", p, len(df))
+                    return df
+            except Exception as e:
+                logger.debug("Failed to read mirrored %s : %s", p, e)
 
     logger.warning("Data not found for %s%s (expiry %s) locally or on S3", strike, opt_type, expiry_date)
     return None
@@ -267,6 +188,117 @@ def resample_1m_to_5m(df_1m: pd.DataFrame):
     res = df.resample("5T").agg({"Open": "first", "High": "max", "Low": "min", "Close": "last"}).dropna()
     return res
 
+class ContractDataProvider:
+    """
+    Run-scoped source of option contract bars for the backtester.
+
+    The combined parquet is read and indexed once, on first use. Per-contract
+    1m frames and per-(contract, day) 5m frames are kept in small LRUs, and
+    contracts that could not be found anywhere are remembered so they are
+    not probed again (locally or on S3) in the same run.
+    """
+
+    def __init__(self, combined_path=LOCAL_COMBINED, maxsize=256, mirror=None):
+        self.combined_path = Path(combined_path)
+        self.maxsize = maxsize
+        self._index = None
+        self._index_loaded = False
+        self._mirror = mirror
+        self._minute = OrderedDict()
+        self._five = OrderedDict()
+        self._missing = set()
+        self.hits = self.misses = self.negative_hits = 0
+
+    @property
+    def index(self):
+        if not self._index_loaded:
+            self._index_loaded = True
+            if self.combined_path.exists():
+                try:
+                    self._index = load_combined_index(self.combined_path)
+                except Exception as e:
+                    logger.exception("Error reading combined parquet: %s", e)
+        return self._index
+
+    @property
+    def mirror(self):
+        if self._mirror is None:
+            self._mirror = build_r2_mirror() or False
+        return self._mirror or None
+
+    def prefetch(self, contracts):
+        """
+        Download, concurrently, every (strike, opt_type, expiry) contract
+        that is neither on disk nor in the combined index.
+        """
+        remote = []
+        for strike, opt_type, expiry in dict.fromkeys(contracts):
+            key = (pd.Timestamp(expiry).date(), int(strike), str(opt_type).upper())
+            if key in self._minute or key in self._missing:
+                continue
+            if any(p.exists() for p in local_strike_files(strike, opt_type, expiry)):
+                continue
+            if self.index is not None and self.index.lookup(strike, opt_type, expiry) is not None:
+                continue
+            remote.append((strike, opt_type, expiry))
+        if remote and self.mirror is not None:
+            self.mirror.prefetch(remote)
+
+    def _remember(self, cache, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.maxsize:
+            cache.popitem(last=False)
+        return value
+
+    def minute_bars(self, strike, opt_type, expiry_date):
+        """1m frame for a contract, or None if it is known to be missing."""
+        key = (pd.Timestamp(expiry_date).date(), int(strike), str(opt_type).upper())
+        if key in self._missing:
+            self.negative_hits += 1
+            return None
+        if key in self._minute:
+            self.hits += 1
+            self._minute.move_to_end(key)
+            return self._minute[key]
+        self.misses += 1
+        # False: the combined file was already checked and has no contract index
+        index = self.index if self.index is not None else False
+        df = load_strike_data_local(strike, opt_type, expiry_date=expiry_date, combined_index=index,
+                                    mirror=self.mirror or False)
+        if df is None:
+            self._missing.add(key)
+            return None
+        return self._remember(self._minute, key, df)
+
+    def five_minute_bars(self, strike, opt_type, expiry_date, day):
+        """
+        5m frame for one contract and calendar day: None if the contract is
+        missing or has no OHLC columns, empty if it did not trade that day.
+        """
+        day = pd.Timestamp(day).normalize()
+        key = (pd.Timestamp(expiry_date).date(), int(strike), str(opt_type).upper(), day)
+        if key in self._five:
+            self.hits += 1
+            self._five.move_to_end(key)
+            return self._five[key]
+        df_min = self.minute_bars(strike, opt_type, expiry_date)
+        if df_min is None:
+            return None
+        df_min = df_min.loc[day : day + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)]
+        df_5m = resample_1m_to_5m(df_min) if not df_min.empty else df_min
+        return self._remember(self._five, key, df_5m)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "missing": len(self._missing),
+            "cached_1m": len(self._minute),
+            "cached_5m": len(self._five),
+        }
+
 def simulate_trade_on_series(df_5m: pd.DataFrame, buy_time: pd.Timestamp, target_pts=TARGET_POINTS, stop_pts=STOP_POINTS):
     """
     buy_time is the timestamp in original entry (e.g. 2023-12-26 10:30:00).
@@ -321,81 +353,101 @@ def simulate_trade_on_series(df_5m: pd.DataFrame, buy_time: pd.Timestamp, target
     }
 
 def build_strike_list_from_entrypoints():
-    if not ENTRY_FILE.exists():
+    """
+    (rows_unique, dedup_strikes) from the entry-point file.
+    Reads entrypoints.parquet, falling back to entrypoints.xlsx.
+    """
+    path = ENTRY_FILE if ENTRY_FILE.exists() else ENTRY_EXCEL_FILE
+    if not path.exists():
         raise FileNotFoundError(f"{ENTRY_FILE} not found")
-    df = pd.read_excel(ENTRY_FILE)
+    df = read_entry_points(path) if path == ENTRY_FILE else pd.read_excel(path)
     if "Type" not in df.columns or "ClosePrice" not in df.columns or "Time" not in df.columns:
-        # user specified Time column exists in excel
-        # allow "time" column or try to infer last column as time
-        raise ValueError("entrypoints.xlsx must contain 'Type', 'ClosePrice' and 'Time' columns")
-    strikes = []
-    # also keep rows details so we can map back entry time per row
-    rows = []
-    for _, r in df.iterrows():
-        type_val = r["Type"]
-        cp = r["ClosePrice"]
-        time_val = r["Time"]
-        try:
-            close_price = float(cp)
-        except Exception:
-            continue
-        # time string may be like '2023-12-26 10:30:00'
-        time_ts = pd.to_datetime(time_val)
-        s = strikes_from_entry_row(type_val, close_price)
-        for st, tp in s:
-            strikes.append((st, tp))
-            rows.append({"strike": st, "type": tp, "entry_time": time_ts})
-    # deduplicate by strike+type but preserve one entry_time per original row by using rows list
-    # return rows list (unique by strike+type+entry_time) and a deduped strike list
-    unique_pairs = {}
-    for r in rows:
-        key = (r["strike"], r["type"], r["entry_time"])
-        unique_pairs[key] = r
-    rows_unique = list(unique_pairs.values())
+        raise ValueError(f"{path} must contain 'Type', 'ClosePrice' and 'Time' columns")
+    return strike_rows_from_entries(df)
+
+def strike_rows_from_entries(df):
+    """
+    (rows_unique, dedup_strikes) for an entry-point frame: three strikes per
+    entry row, first occurrence kept per (strike, type, entry_time).
+    """
+    close = pd.to_numeric(df["ClosePrice"], errors="coerce").to_numpy(dtype=np.float64)
+    tl = df["Type"].astype(str).str.lower()
+    is_ce = (tl.str.contains("buy") & tl.str.contains("ce")).to_numpy()
+    is_pe = (tl.str.contains("buy") & tl.str.contains("pe")).to_numpy() & ~is_ce
+    keep = (is_ce | is_pe) & ~np.isnan(close)
+    times = pd.to_datetime(df["Time"]).to_numpy()[keep]
+    close, is_ce = close[keep], is_ce[keep]
+
+    # CE: floor to 50 and step down; PE: ceil to 50 and step up (as strikes_from_entry_row)
+    start = np.where(is_ce, np.floor(close / 50) * 50, np.ceil(close / 50) * 50).astype(np.int64)
+    step = np.where(is_ce, -50, 50)
+    strikes = (start[:, None] + step[:, None] * np.arange(3)).ravel()
+    rows = pd.DataFrame({
+        "strike": strikes,
+        "type": np.repeat(np.where(is_ce, "CE", "PE"), 3),
+        "entry_time": np.repeat(times, 3),
+    }).drop_duplicates(subset=["strike", "type", "entry_time"])
+
+    rows_unique = [
+        {"strike": st, "type": tp, "entry_time": pd.Timestamp(t)}
+        for st, tp, t in zip(rows["strike"].tolist(), rows["type"].tolist(), rows["entry_time"])
+    ]
     dedup_strikes = sorted({(r["strike"], r["type"]) for r in rows_unique}, key=lambda x: (x[0], x[1]))
     return rows_unique, dedup_strikes
 
-def main_process(expiry_date="2023-12-28", target_pts=TARGET_POINTS, stop_pts=STOP_POINTS, day_needed="2023-12-26"):
-    # Build list from entrypoints
-    rows_unique, dedup_strikes = build_strike_list_from_entrypoints()
-
+def write_results(out_df, path=OUTPUT_FILE, excel_path=None):
+    """Save typed results as parquet; also as Excel when excel_path is given."""
+    out_df = out_df.astype(RESULT_DTYPES)
+    out_df.to_parquet(path, index=False)
+    if excel_path is not None:
+        out_df.to_excel(excel_path, index=False)
+    return out_df
+
+def simulate_entry_rows(rows_unique, expiry_date, day_needed, target_pts=TARGET_POINTS, stop_pts=STOP_POINTS,
+                        provider=None):
+    """Simulate (strike, type, entry_time) rows for one expiry and day; returns (results, counts)."""
+    provider = provider or ContractDataProvider()
     results = []
     counts = {"target": 0, "stoploss": 0, "none": 0}
 
-    # For each row (strike+type+entry_time), load instrument minute data, restrict to day_needed, resample 5m and simulate
-    for r in rows_unique:
-        strike = r["strike"]
-        opt_type = r["type"]
-        entry_time = r["entry_time"]
-
-        df_min = load_strike_data_local(strike, opt_type, expiry_date=expiry_date)
-        if df_min is None:
+    # Group rows by contract: load/resample each contract once and simulate
+    # all of its entries in one batch; results keep the entry-row order
+    by_contract = {}
+    for i, r in enumerate(rows_unique):
+        by_contract.setdefault((r["strike"], r["type"]), []).append(i)
+    provider.prefetch((strike, opt_type, expiry_date) for strike, opt_type in by_contract)
+    sims = {}
+    for (strike, opt_type), idx in by_contract.items():
+        if provider.minute_bars(strike, opt_type, expiry_date) is None:
             print(f"⚠️ Data not found for {strike}{opt_type}, expiry {expiry_date}. Skipping.")
             continue
 
-        # filter to day_needed only
-        df_min = df_min.loc[pd.to_datetime(day_needed) : pd.to_datetime(day_needed) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)]
-        if df_min.empty:
+        # day_needed only, resampled to 5m
+        df_5m = provider.five_minute_bars(strike, opt_type, expiry_date, day_needed)
+        if df_5m is None:
+            print(f"⚠️ Cannot resample for {strike}{opt_type}. Skipping.")
+            continue
+        if df_5m.empty:
             print(f"⚠️ No data on {day_needed} for {strike}{opt_type}. Skipping.")
             continue
 
-        # resample 5m
-        df_5m = resample_1m_to_5m(df_min)
-        if df_5m is None or df_5m.empty:
-            print(f"⚠️ Cannot resample for {strike}{opt_type}. Skipping.")
-            continue
+        batch = simulate_trades(df_5m, [rows_unique[i]["entry_time"] for i in idx], target_pts, stop_pts)
+        for i, sim in zip(idx, batch):
+            if sim is None:
+                print(f"⚠️ Simulation failed for {strike}{opt_type}.")
+                continue
+            sims[i] = sim
 
-        sim = simulate_trade_on_series(df_5m, entry_time, target_pts=target_pts, stop_pts=stop_pts)
+    for i, r in enumerate(rows_unique):
+        sim = sims.get(i)
         if sim is None:
-            print(f"⚠️ Simulation failed for {strike}{opt_type}.")
             continue
-
         outcome = sim["outcome"]
         counts[outcome] = counts.get(outcome, 0) + 1
 
         results.append({
-            "strike": strike,
-            "type": opt_type,
+            "strike": r["strike"],
+            "type": r["type"],
             "expiry": expiry_date,
             "day": day_needed,
             "buy_candle_ts": sim["buy_candle_ts"],
@@ -406,19 +458,25 @@ def main_process(expiry_date="2023-12-28", target_pts=TARGET_POINTS, stop_pts=ST
             "hit_time": sim["hit_time"],
         })
 
-    # write results to excel
+    return results, counts
+
+def main_process(expiry_date="2023-12-28", target_pts=TARGET_POINTS, stop_pts=STOP_POINTS, day_needed="2023-12-26",
+                 write_excel=False, provider=None):
+    # Build list from entrypoints
+    rows_unique, dedup_strikes = build_strike_list_from_entrypoints()
+    # one provider per run: repeated strikes across entry rows load once
+    provider = provider or ContractDataProvider()
+
+    results, counts = simulate_entry_rows(rows_unique, expiry_date, day_needed, target_pts, stop_pts, provider)
+
+    # write results (parquet always, Excel report on request)
     if results:
         out_df = pd.DataFrame(results)
-        # format timestamps
-        out_df["buy_candle_ts"] = pd.to_datetime(out_df["buy_candle_ts"])
-        out_df["hit_time"] = pd.to_datetime(out_df["hit_time"])
-        # save
-        out_df.to_excel(OUTPUT_FILE, index=False)
-        # append summary sheet (if using ExcelWriter)
-        # simple print summary
+        write_results(out_df, OUTPUT_FILE, OUTPUT_EXCEL_FILE if write_excel else None)
         print(f"Saved results to {OUTPUT_FILE}. Summary: targets={counts['target']}, stoplosses={counts['stoploss']}, none={counts['none']}")
     else:
         print("No results to save.")
+    logger.info("Contract data: %s", provider.stats())
 
     return results, counts
 
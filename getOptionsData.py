@@ -1,8 +1,17 @@
 import s3fs
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+import gzip
 import logging
+import time
+
+from chartPayload import epoch_seconds, candle_records, line_records, page_bounds
+from indicators import warmup_bars
+from optionsIndex import OptionsIndex, parse_symbols
 
 # ...existing code...
 
@@ -51,23 +60,156 @@ def _read_parquet_s3(path, storage_options):
     return pd.read_parquet(uri, storage_options=storage_options)
 
 
-def _detect_datetime_column(df):
-    # find a datetime-like column
-    for c in df.columns:
-        lc = c.lower()
-        if lc in ("datetime", "date", "timestamp", "time") or "date" in lc:
-            return c
-    # fallback to index if datetime-like
-    if isinstance(df.index, pd.DatetimeIndex):
-        return None
-    raise ValueError("No datetime-like column found")
+# --- Contract file decoding ---
+OHLC = ["Open", "High", "Low", "Close"]
+OHLC_NAMES = {
+    "Open": ("open", "OPEN", "Open"),
+    "High": ("high", "HIGH", "High"),
+    "Low": ("low", "LOW", "Low"),
+    "Close": ("close", "CLOSE", "Close", "lastPrice", "last"),
+}
+CONTRACT_COLUMNS = ["expiry", "strike", "opt_type"]
+RANGE_BLOCK = 1 << 16  # read-ahead per remote request; small so pruned columns are skipped
+
+
+def contract_from_path(path):
+    """(expiry, strike, opt_type) from .../NIFTY/<expiry>/<strike><type>.parquet[.gz]."""
+    parts = path.replace("\\", "/").split("/")
+    strike, opt_type = parse_symbols([parts[-1]])
+    if strike[0] < 0:
+        raise ValueError(f"No strike/type in file name: {path}")
+    return parts[-2], int(strike[0]), opt_type[0]
+
 
+def _pruned_columns(names):
+    """(datetime column or None, {source column: OHLC name}) chosen from the file schema."""
+    dt_col = next((c for c in names if c.lower() in ("datetime", "date", "timestamp", "time") or "date" in c.lower()), None)
+    picked = {}
+    for target, candidates in OHLC_NAMES.items():
+        for c in candidates:
+            if c in names:
+                picked[c] = target
+                break
+    return dt_col, picked
 
-def load_december_2023(reload=False, limit_files=None):
+
+def decode_contract_file(source, path):
+    """
+    Decode one contract parquet (bytes or a seekable file) reading only the
+    datetime and OHLC columns; from an open remote file only the footer and
+    those column chunks are fetched. Returns (contract, int64 epoch-ns
+    times, float64 [n, 4] OHLC).
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = pa.BufferReader(source)
+    pf = pq.ParquetFile(source)
+    names = pf.schema_arrow.names
+    dt_col, picked = _pruned_columns(names)
+    if set(picked.values()) != set(OHLC):
+        raise ValueError(f"File missing OHLC, skipping: {path}")
+    index_cols = [c for c in (pf.schema_arrow.pandas_metadata or {}).get("index_columns", []) if isinstance(c, str)]
+    if dt_col is None and not index_cols:
+        raise ValueError(f"Skipping file (no datetime): {path}")
+    table = pf.read(columns=[dt_col or index_cols[0]] + list(picked))
+    # keep a stored index as a plain column so it can be looked up by name
+    df = table.to_pandas(ignore_metadata=True)
+    times = pd.to_datetime(df[dt_col or index_cols[0]])
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+    ohlc = df[list(picked)].rename(columns=picked)[OHLC].to_numpy(dtype=np.float64)
+    return contract_from_path(path), times.to_numpy(dtype="datetime64[ns]").view(np.int64), ohlc
+
+
+def _requested_bytes(fh):
+    """Bytes fetched through an fsspec file (its size when the cache does not count them)."""
+    requested = getattr(getattr(fh, "cache", None), "total_requested_bytes", None)
+    return requested if requested is not None else getattr(fh, "size", 0)
+
+
+class ColumnBuffer:
+    """Growable preallocated arrays that decoded files are streamed into."""
+
+    def __init__(self, capacity):
+        self.size = 0
+        self.times = np.empty(capacity, dtype=np.int64)
+        self.ohlc = np.empty((capacity, 4), dtype=np.float64)
+        self.contract = np.empty(capacity, dtype=np.int32)
+
+    def append(self, code, times, ohlc):
+        need = self.size + len(times)
+        if need > len(self.times):
+            cap = max(need, 2 * len(self.times))
+            self.times = np.resize(self.times, cap)
+            self.ohlc = np.resize(self.ohlc, (cap, 4))
+            self.contract = np.resize(self.contract, cap)
+        self.times[self.size:need] = times
+        self.ohlc[self.size:need] = ohlc
+        self.contract[self.size:need] = code
+        self.size = need
+
+    def to_frame(self, contracts):
+        """
+        Frame sorted by (expiry, strike, opt_type, Datetime); duplicate
+        timestamps are dropped within a contract only.
+        """
+        n = self.size
+        ranked = sorted(range(len(contracts)), key=lambda i: contracts[i])
+        rank = np.empty(len(contracts), dtype=np.int32)
+        rank[ranked] = np.arange(len(contracts), dtype=np.int32)
+        codes = rank[self.contract[:n]]
+        order = np.lexsort((self.times[:n], codes))
+        times, codes, ohlc = self.times[:n][order], codes[order], self.ohlc[:n][order]
+        keep = np.ones(n, dtype=bool)
+        keep[1:] = (times[1:] != times[:-1]) | (codes[1:] != codes[:-1])
+        times, codes, ohlc = times[keep], codes[keep], ohlc[keep]
+        table = pd.DataFrame([contracts[i] for i in ranked], columns=CONTRACT_COLUMNS)
+        df = pd.DataFrame(ohlc, columns=OHLC, index=pd.DatetimeIndex(times.view("datetime64[ns]"), name="Datetime"))
+        df.insert(0, "expiry", pd.Categorical(table["expiry"].to_numpy()[codes]))
+        df.insert(1, "strike", table["strike"].to_numpy(dtype=np.int64)[codes])
+        df.insert(2, "opt_type", pd.Categorical(table["opt_type"].to_numpy()[codes], categories=["CE", "PE"]))
+        return df
+
+
+class LoadProgress:
+    """Files / rows / bytes counters with periodic throughput logging."""
+
+    def __init__(self, total, every=25):
+        self.total = total
+        self.every = every
+        self.files = self.failed = self.rows = self.bytes = 0
+        self.started = time.perf_counter()
+
+    def update(self, rows=0, nbytes=0, failed=False):
+        self.files += 1
+        self.failed += int(failed)
+        self.rows += rows
+        self.bytes += nbytes
+        if self.files % self.every == 0 or self.files == self.total:
+            m = self.metrics()
+            logger.info("Loaded %d/%d files, %d rows (%.1f files/s, %.0f rows/s, %.1f MB/s)",
+                        self.files, self.total, self.rows, m["files_per_s"], m["rows_per_s"], m["mb_per_s"])
+
+    def metrics(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "files": self.files, "failed": self.failed, "rows": self.rows, "bytes": self.bytes,
+            "seconds": elapsed, "files_per_s": self.files / elapsed, "rows_per_s": self.rows / elapsed,
+            "mb_per_s": self.bytes / elapsed / 1e6,
+        }
+
+
+def load_december_2023(reload=False, limit_files=None, max_workers=16, fs=None):
     """
     Load and concatenate all December 2023 NIFTY option parquet files from S3.
-    Returns a DataFrame indexed by Datetime (tz-naive, UTC assumed if present).
+    Returns a DataFrame indexed by Datetime (tz-naive, UTC assumed if present)
+    with expiry / strike / opt_type columns identifying each contract, sorted
+    by contract then time.
     If reload=False and LOCAL_CACHE exists, loads from local cache.
+
+    Files are fetched and decoded by a bounded thread pool (ranged reads of
+    only the datetime and OHLC column chunks) and streamed into one preallocated buffer, so
+    there is no per-file DataFrame or final concat. Progress and throughput
+    are logged, and the final metrics are in df.attrs["load_metrics"].
     """
     try:
         if not reload:
@@ -78,78 +220,76 @@ def load_december_2023(reload=False, limit_files=None):
             except Exception:
                 pass
 
-        fs = _build_s3_fs()
+        fs = fs or _build_s3_fs()
         files = _find_december_files(fs)
         if limit_files:
             files = files[:limit_files]
         logger.info("Found %d parquet files for December 2023", len(files))
 
-        dfs = []
-        for f in files:
+        def fetch_and_decode(f):
             try:
-                df = _read_parquet_s3(f, storage_options={
-                    "anon": False,
-                    "key": S3_PARAMS["key"],
-                    "secret": S3_PARAMS["secret"],
-                    "client_kwargs": S3_PARAMS.get("client_kwargs", {}),
-                    "endpoint_url": S3_PARAMS.get("endpoint_url"),
-                })
-                # detect datetime
-                dt_col = _detect_datetime_column(df)
-                if dt_col:
-                    df[dt_col] = pd.to_datetime(df[dt_col])
-                    df = df.rename(columns={dt_col: "Datetime"})
-                elif isinstance(df.index, pd.DatetimeIndex):
-                    df = df.reset_index().rename(columns={df.index.name or "index": "Datetime"})
-                    df["Datetime"] = pd.to_datetime(df["Datetime"])
-                else:
-                    logger.warning("Skipping file (no datetime): %s", f)
+                # ranged reads: footer + the pruned column chunks only
+                with fs.open(f, "rb", block_size=RANGE_BLOCK) as fh:
+                    decoded = decode_contract_file(fh, f)
+                    return _requested_bytes(fh), decoded
+            except pa.ArrowInvalid:
+                # gzip-wrapped .parquet.gz has no random access: whole object
+                raw = gzip.decompress(fs.cat_file(f))
+                return len(raw), decode_contract_file(raw, f)
+
+        progress = LoadProgress(len(files))
+        buffer = None
+        contracts = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dec2023") as pool:
+            futures = {pool.submit(fetch_and_decode, f): f for f in files}
+            for fut in as_completed(futures):
+                f = futures[fut]
+                try:
+                    nbytes, (contract, times, ohlc) = fut.result()
+                except Exception as e:
+                    logger.warning("Error reading %s: %s", f, e)
+                    progress.update(failed=True)
                     continue
-
-                df = df.set_index("Datetime").sort_index()
-                # keep only OHLC columns if present, normalized names
-                cols = {c: c for c in df.columns}
-                # attempt to normalize: common names Open/High/Low/Close
-                for cand in ["open", "OPEN", "Open"]:
-                    if cand in df.columns:
-                        cols[cand] = "Open"
-                for cand in ["high", "HIGH", "High"]:
-                    if cand in df.columns:
-                        cols[cand] = "High"
-                for cand in ["low", "LOW", "Low"]:
-                    if cand in df.columns:
-                        cols[cand] = "Low"
-                for cand in ["close", "CLOSE", "Close", "lastPrice", "last"]:
-                    if cand in df.columns and "Close" not in df.columns:
-                        cols[cand] = "Close"
-                df = df.rename(columns=cols)
-                # ensure OHLC exist
-                if not {"Open", "High", "Low", "Close"}.issubset(df.columns):
-                    logger.warning("File missing OHLC, skipping: %s", f)
-                    continue
-
-                dfs.append(df[["Open", "High", "Low", "Close"]])
-            except Exception as e:
-                logger.exception("Error reading %s: %s", f, e)
-                continue
-
-        if not dfs:
+                if buffer is None:
+                    # size for every file looking like the first, grow if needed
+                    buffer = ColumnBuffer(int(len(times) * len(files) * 1.1) + 1)
+                code = contracts.setdefault(contract, len(contracts))
+                buffer.append(code, times, ohlc)
+                progress.update(rows=len(times), nbytes=nbytes)
+
+        if buffer is None or not buffer.size:
             raise RuntimeError("No valid parquet files found for December 2023")
 
-        full = pd.concat(dfs, axis=0)
-        full = full[~full.index.duplicated(keep="first")].sort_index()
+        full = buffer.to_frame(list(contracts))
+        full.attrs["load_metrics"] = progress.metrics()
         # optional: store local cache
         try:
             full.to_parquet(LOCAL_CACHE, index=True)
         except Exception:
             pass
-        logger.info("Concatenated dataframe rows: %d", len(full))
+        logger.info("Combined dataframe rows: %d from %d contracts (%s)", len(full), len(contracts), progress.metrics())
         return full
     except Exception as e:
         logger.exception("Failed to load December data: %s", e)
         raise
 
 
+def single_series(df, contract=None):
+    """
+    One OHLC series from the loaded data: the given (expiry, strike,
+    opt_type) contract, or, without one, the first row per timestamp (the
+    old collapsed view). Frames without contract columns pass through.
+    """
+    if not set(CONTRACT_COLUMNS).issubset(df.columns):
+        return df
+    if contract is not None:
+        expiry, strike, opt_type = contract
+        sub = OptionsIndex.from_frame(df).lookup(strike, opt_type, expiry)
+        return sub if sub is not None else df.iloc[:0][OHLC]
+    df = df.sort_index(kind="stable")
+    return df[~df.index.duplicated(keep="first")][OHLC]
+
+
 # --- Indicators ---
 def sma(series, length):
     return series.rolling(window=length, min_periods=1).mean()
@@ -173,13 +313,20 @@ INTERVAL_MAP = {
 }
 
 
-def resample_and_format(df, interval="1m", limit=1000, before_ts=None, rsi_period=9, rsi_avg=3):
+def resample_and_format(df, interval="1m", limit=1000, before_ts=None, rsi_period=9, rsi_avg=3,
+                        windowed=False, warmup=None, contract=None):
     """
     Resample the consolidated December dataframe to the requested interval,
     compute SMA_5, SMA_20, RSI and return frontend-ready dict:
     { "candles": [...], "sma5": [...], "sma20": [...], "rsi_base": [...], "rsi_avg": [...] }
     time values are epoch seconds (int).
+    With windowed=True indicators are computed only on the requested page plus
+    `warmup` bars before it (default: indicators.warmup_bars), see that
+    function for the deviation bound versus full history.
+    `contract` = (expiry, strike, opt_type) picks one contract, see single_series.
     """
+    if df is not None:
+        df = single_series(df, contract)
     if df is None or df.empty:
         return {"candles": [], "sma5": [], "sma20": [], "rsi_base": [], "rsi_avg": []}
 
@@ -188,27 +335,27 @@ def resample_and_format(df, interval="1m", limit=1000, before_ts=None, rsi_perio
     if res.empty:
         return {"candles": [], "sma5": [], "sma20": [], "rsi_base": [], "rsi_avg": []}
 
+    # page bounds first, so windowed mode only computes what it needs
+    start, stop = page_bounds(res.index, int(before_ts) if before_ts else None, limit)
+    span_start = 0
+    if windowed:
+        span_start = max(0, start - int(warmup if warmup is not None else warmup_bars(rsi_period, rsi_avg)))
+    res = res.iloc[span_start:stop].copy()
+
     # indicators
     res["SMA_5"] = sma(res["Close"], 5)
     res["SMA_20"] = sma(res["Close"], 20)
     res["RSI_Base"] = rsi(res["Close"], length=rsi_period)
     res["RSI_Avg"] = sma(res["RSI_Base"], rsi_avg)
 
-    # filter by before_ts if provided
-    if before_ts:
-        cutoff = pd.to_datetime(int(before_ts), unit="s")
-        res = res[res.index < cutoff]
-
-    res = res.tail(limit)
-
-    candles = [
-        {"time": int(ts.timestamp()), "open": float(r.Open), "high": float(r.High), "low": float(r.Low), "close": float(r.Close)}
-        for ts, r in res.iterrows()
-    ]
-    sma5 = [{"time": int(ts.timestamp()), "value": float(r.SMA_5)} for ts, r in res.iterrows() if not pd.isna(r.SMA_5)]
-    sma20 = [{"time": int(ts.timestamp()), "value": float(r.SMA_20)} for ts, r in res.iterrows() if not pd.isna(r.SMA_20)]
-    rsi_base = [{"time": int(ts.timestamp()), "value": float(r.RSI_Base) if not pd.isna(r.RSI_Base) else 0} for ts, r in res.iterrows()]
-    rsi_avg_line = [{"time": int(ts.timestamp()), "value": float(r.RSI_Avg) if not pd.isna(r.RSI_Avg) else 0} for ts, r in res.iterrows()]
+    res = res.iloc[start - span_start:]
+
+    times = epoch_seconds(res.index)
+    candles = candle_records(times, res)
+    sma5 = line_records(times, res["SMA_5"])
+    sma20 = line_records(times, res["SMA_20"])
+    rsi_base = line_records(times, res["RSI_Base"], fill=0)
+    rsi_avg_line = line_records(times, res["RSI_Avg"], fill=0)
 
     return {
         "candles": candles,
@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from flask import Response, current_app
+
+from singleFlight import SingleFlight
+
+try:  # brotli is optional; without it responses negotiate gzip only
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Server preference when the client accepts several with the same quality
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+IMMUTABLE = "public, max-age=31536000, immutable"  # pages strictly before the last bar
+REVALIDATE = "no-cache"  # pages that include the last bar: revalidate, usually a 304
+
+
+def make_etag(*parts):
+    """Strong ETag (quoted) for a response identified by JSON-serialisable parts."""
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def encoded_etag(etag, encoding):
+    """
+    Per-representation tag: a compressed body is different bytes, so a
+    strong ETag gets an encoding suffix ("abc" -> "abc-gzip").
+    """
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def etag_matches(if_none_match, etag):
+    """
+    If-None-Match check (weak comparison, as RFC 9110 requires for it).
+    Encoding suffixes are ignored, so a tag cached from a gzip response
+    also validates the identity one.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.strip('"')
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        for encoding in ("br", "gzip"):
+            if tag.endswith(f"-{encoding}"):
+                tag = tag[: -len(encoding) - 1]
+        if tag == bare:
+            return True
+    return False
+
+
+def compress(raw, encoding):
+    if encoding == "br":
+        return brotli.compress(raw, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(raw, compresslevel=GZIP_LEVEL)
+    return raw
+
+
+class ResponseCache:
+    """
+    Conditional, compressed JSON responses with a small LRU of encoded bodies.
+
+    The caller names a response by an ETag computed from its inputs before
+    doing any work. A matching If-None-Match is answered 304 straight away;
+    otherwise the body is taken from the LRU (keyed by ETag and encoding),
+    or built, serialised and compressed once and kept there, so identical
+    requests from other tabs or clients skip the computation as well.
+    Concurrent misses for the same body share one build.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.not_modified = 0
+        self.raw_bytes = self.sent_bytes = 0
+        self._flights = SingleFlight()
+
+    def respond(self, request, etag, cache_control, build):
+        """Response for `etag`; build() -> JSON-serialisable payload, called only on a cache miss."""
+        encoding = request.accept_encodings.best_match(ENCODINGS)
+        headers = {
+            "ETag": encoded_etag(etag, encoding),
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status=304, headers=headers)
+
+        key = (etag, encoding)
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+                self.hits += 1
+        if body is None:
+            # identical requests arriving together share one build
+            body = self._flights.do(key, lambda: self._encode(key, encoding, build))
+        with self._lock:
+            self.sent_bytes += len(body)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(body, mimetype="application/json", headers=headers)
+
+    def _encode(self, key, encoding, build):
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:  # stored by a flight that just finished
+                self.hits += 1
+                return body
+        raw = current_app.json.dumps(build()).encode()
+        body = compress(raw, encoding)
+        with self._lock:
+            self.misses += 1
+            self.raw_bytes += len(raw)
+            self._bodies[key] = body
+            self._bodies.move_to_end(key)
+            while len(self._bodies) > self.maxsize:
+                self._bodies.popitem(last=False)
+        return body
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._bodies),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "coalesced": self._flights.coalesced,
+                "encodings": list(ENCODINGS),
+                "raw_bytes": self.raw_bytes,
+                "sent_bytes": self.sent_bytes,
+            }
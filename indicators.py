@@ -0,0 +1,379 @@
+import copy
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+from singleFlight import SingleFlight
+
+
+class IndicatorCache:
+    """
+    Bounded LRU of computed indicator frames.
+
+    Entries are keyed by (interval, rsi_period, rsi_avg) and stamped with the
+    candle data version they were computed from. When a newer version is seen
+    the older entries stop being served; they are only handed to `compute`
+    once more (as `previous`) so it can extend them instead of starting over.
+    Concurrent misses for the same key and version wait on one computation.
+    Cached values are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._previous = {}
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._flights = SingleFlight()
+
+    def get_or_compute(self, version, key, compute):
+        with self._lock:
+            if self._version is None or version > self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._previous = dict(self._entries)
+                self._entries = OrderedDict()
+                self._version = version
+            if version == self._version:
+                frame = self._entries.get(key)
+                if frame is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return frame
+        # concurrent misses for one key (every client right after a refresh)
+        # share a single computation
+        return self._flights.do((version, key), lambda: self._fill(version, key, compute))
+
+    def _fill(self, version, key, compute):
+        with self._lock:
+            # a reader still holding a superseded snapshot is served but not cached
+            previous = None
+            if version == self._version:
+                frame = self._entries.get(key)
+                if frame is not None:  # filled by a flight that just finished
+                    self.hits += 1
+                    return frame
+                previous = self._previous.pop(key, None)
+            self.misses += 1
+
+        # compute outside the lock so other keys are not held up
+        frame = compute(previous)
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = frame
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return frame
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._previous = {}
+            self._version = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "coalesced": self._flights.coalesced,
+            }
+
+
+# -------------------- Incremental indicators --------------------
+# Each indicator carries just enough state to produce the value for the next
+# bar in O(1). push() appends a bar, amend() revises the most recent bar (a
+# still-forming candle) and seed() warms the state up from a full history in
+# one vectorised pass, so a long series never has to be replayed bar by bar.
+
+NAN = float("nan")
+
+
+class RollingSMA:
+    """Simple moving average, same semantics as Series.rolling(length, min_periods).mean()."""
+
+    def __init__(self, length, min_periods=None):
+        self.length = length
+        self.min_periods = length if min_periods is None else min_periods
+        self._window = deque(maxlen=length)
+
+    def _value(self):
+        vals = [v for v in self._window if v == v]
+        if len(vals) < max(self.min_periods, 1):
+            return NAN
+        return sum(vals) / len(vals)
+
+    def push(self, x):
+        self._window.append(x)
+        return self._value()
+
+    def amend(self, x):
+        self._window[-1] = x
+        return self._value()
+
+    def seed(self, values):
+        self._window = deque(np.asarray(values, dtype=np.float64)[-self.length:].tolist(), maxlen=self.length)
+
+
+class EwmMean:
+    """
+    Exponentially weighted mean using the same recurrence as pandas'
+    Series.ewm(alpha=..., adjust=..., min_periods=...).mean() (ignore_na=False),
+    so incremental values match the batch output exactly.
+    """
+
+    def __init__(self, alpha, adjust=True, min_periods=0):
+        self.alpha = alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self._state = (NAN, 1.0, 0)  # weighted, old_wt, nobs
+        self._prev_state = self._state
+
+    def _step(self, state, cur):
+        weighted, old_wt, nobs = state
+        is_obs = cur == cur
+        nobs += is_obs
+        if weighted == weighted:
+            old_wt *= 1.0 - self.alpha
+            if is_obs:
+                new_wt = 1.0 if self.adjust else self.alpha
+                if weighted != cur:
+                    weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+                old_wt = old_wt + new_wt if self.adjust else 1.0
+        elif is_obs:
+            weighted = cur
+        return weighted, old_wt, nobs
+
+    def _value(self):
+        weighted, _, nobs = self._state
+        return weighted if nobs >= self.min_periods else NAN
+
+    def push(self, x):
+        self._prev_state = self._state
+        self._state = self._step(self._state, x)
+        return self._value()
+
+    def amend(self, x):
+        self._state = self._step(self._prev_state, x)
+        return self._value()
+
+    def seed(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        weighted = pd.Series(values).ewm(alpha=self.alpha, adjust=self.adjust).mean().to_numpy()
+        # the weight recurrence does not depend on the values, so replay just that
+        obs = ~np.isnan(values)
+        observed = np.flatnonzero(obs)
+        factor = 1.0 - self.alpha
+        old_wt = prev_wt = 1.0
+        if len(observed):
+            for is_obs in obs[observed[0] + 1:].tolist():
+                prev_wt = old_wt
+                old_wt *= factor
+                if is_obs:
+                    old_wt = old_wt + 1.0 if self.adjust else 1.0
+        nobs = int(obs.sum())
+        # keep the state before the last bar too, so amend() works straight after seeding
+        if len(values) > 1:
+            self._prev_state = (float(weighted[-2]), prev_wt, nobs - int(obs[-1]))
+        else:
+            self._prev_state = (NAN, 1.0, 0)
+        self._state = (float(weighted[-1]), old_wt, nobs)
+
+
+class IncrementalRSI:
+    """
+    RSI fed one close at a time.
+
+    style="pandas_ta" reproduces ta.rsi (RMA with adjust=True and
+    min_periods=length, RSI = 100 * up / (up + |down|)); style="wilder"
+    reproduces getOptionsData.rsi (ewm adjust=False, RSI = 100 - 100 / (1 + RS)).
+    """
+
+    def __init__(self, length=9, style="pandas_ta"):
+        self.length = length
+        self.style = style
+        adjust = style == "pandas_ta"
+        min_periods = length if style == "pandas_ta" else 0
+        self._up = EwmMean(1.0 / length, adjust=adjust, min_periods=min_periods)
+        self._down = EwmMean(1.0 / length, adjust=adjust, min_periods=min_periods)
+        self._last_close = NAN
+        self._prev_close = NAN
+
+    def _gains(self, close, prev_close):
+        delta = close - prev_close
+        if delta != delta:
+            return NAN, NAN
+        return max(delta, 0.0), min(delta, 0.0)
+
+    def _value(self, up, down):
+        if self.style == "pandas_ta":
+            denom = up + abs(down)
+            if up != up or denom != denom or denom == 0:
+                return NAN
+            return 100 * up / denom
+        if up != up or down != down:
+            return NAN
+        down = -down
+        if down == 0:
+            return NAN if up == 0 else 100.0
+        return 100 - (100 / (1 + up / down))
+
+    def push(self, close):
+        self._prev_close = self._last_close
+        self._last_close = close
+        gain, loss = self._gains(close, self._prev_close)
+        return self._value(self._up.push(gain), self._down.push(loss))
+
+    def amend(self, close):
+        self._last_close = close
+        gain, loss = self._gains(close, self._prev_close)
+        return self._value(self._up.amend(gain), self._down.amend(loss))
+
+    def seed(self, closes):
+        closes = np.asarray(closes, dtype=np.float64)
+        if len(closes) == 0:
+            return
+        delta = np.diff(closes, prepend=NAN)
+        self._up.seed(np.where(np.isnan(delta), NAN, np.maximum(delta, 0.0)))
+        self._down.seed(np.where(np.isnan(delta), NAN, np.minimum(delta, 0.0)))
+        self._last_close = float(closes[-1])
+        self._prev_close = float(closes[-2]) if len(closes) > 1 else NAN
+
+
+INDICATOR_COLUMNS = ["SMA_5", "SMA_20", "RSI_Base", "RSI_Avg"]
+
+
+class IndicatorEngine:
+    """
+    SMA_5 / SMA_20 / RSI_Base / RSI_Avg for one (interval, rsi_period, rsi_avg)
+    series, extended bar by bar. style="pandas_ta" matches the chart server's
+    ta.sma/ta.rsi columns, style="wilder" matches getOptionsData.sma/rsi.
+    """
+
+    def __init__(self, rsi_period=9, rsi_avg=3, style="pandas_ta"):
+        sma_min = None if style == "pandas_ta" else 1
+        self.rsi_period = rsi_period
+        self.rsi_avg = rsi_avg
+        self.style = style
+        self.sma5 = RollingSMA(5, sma_min)
+        self.sma20 = RollingSMA(20, sma_min)
+        self.rsi = IncrementalRSI(rsi_period, style)
+        self.rsi_avg_sma = RollingSMA(rsi_avg, sma_min)
+        self.last_time = None
+
+    def push(self, close):
+        r = self.rsi.push(close)
+        return self.sma5.push(close), self.sma20.push(close), r, self.rsi_avg_sma.push(r)
+
+    def amend(self, close):
+        r = self.rsi.amend(close)
+        return self.sma5.amend(close), self.sma20.amend(close), r, self.rsi_avg_sma.amend(r)
+
+    def seed(self, closes, rsi_values):
+        """
+        Warm the state up from a full Close series and its batch RSI column.
+        A None RSI (ta.rsi on fewer than rsi_period bars) counts as all-NaN.
+        """
+        values = np.asarray(closes, dtype=np.float64)
+        if rsi_values is None:
+            rsi_values = np.full(len(values), NAN)
+        self.sma5.seed(values)
+        self.sma20.seed(values)
+        self.rsi.seed(values)
+        self.rsi_avg_sma.seed(rsi_values)
+        if isinstance(getattr(closes, "index", None), pd.DatetimeIndex) and len(closes):
+            self.last_time = closes.index[-1]
+
+    def extend(self, bars):
+        """
+        Feed new bars (an OHLC frame). A first bar stamped at last_time is
+        treated as a revision of the still-forming candle. Returns a frame of
+        indicator values for the given bars.
+        """
+        rows = []
+        for ts, close in zip(bars.index, bars["Close"].to_numpy(dtype=np.float64).tolist()):
+            if self.last_time is not None and ts == self.last_time:
+                rows.append(self.amend(close))
+            else:
+                rows.append(self.push(close))
+            self.last_time = ts
+        return pd.DataFrame(rows, index=bars.index, columns=INDICATOR_COLUMNS, dtype=np.float64)
+
+
+class IndicatorSeries:
+    """An indicator frame plus the engine state at its last bar and the data version it was built at."""
+
+    def __init__(self, frame, engine, version=None):
+        self.frame = frame
+        self.engine = engine
+        self.version = version
+
+    def extend(self, bars, stable=None, version=None):
+        """
+        Indicator frame for `bars` (OHLC, same interval) reusing this one.
+
+        Works when `bars` only appends to this series, optionally revising
+        its last (still-forming) bar; otherwise returns None and the caller
+        should recompute from scratch. `stable` is the number of leading
+        bars known to be unchanged (CandleSnapshot.stable_rows); without it
+        the histories are compared. Only OHLC + INDICATOR_COLUMNS are kept.
+        """
+        old = self.frame
+        n = len(old)
+        if n == 0 or len(bars) < n or bars.index[n - 1] != old.index[n - 1]:
+            return None
+        ohlc = ["Open", "High", "Low", "Close"]
+        if stable is not None:
+            if stable < n - 1:
+                return None
+        elif not bars.index[:n].equals(old.index) or \
+                not np.array_equal(bars[ohlc].to_numpy()[:n - 1], old[ohlc].to_numpy()[:n - 1]):
+            return None
+
+        engine = copy.deepcopy(self.engine)  # the cached series may still be in use
+        values = engine.extend(bars.iloc[n - 1:]).to_numpy()
+        # OHLC stays the (possibly memory-mapped) level's arrays; only the
+        # indicator columns are new memory
+        frame = bars.copy(deep=False) if list(bars.columns) == ohlc else bars[ohlc]
+        for i, col in enumerate(INDICATOR_COLUMNS):
+            column = np.empty(len(bars))
+            column[:n - 1] = old[col].to_numpy()[:n - 1]
+            column[n - 1:] = values[:, i]
+            frame[col] = column
+        return IndicatorSeries(frame, engine, version)
+
+
+def warmup_bars(rsi_period=9, rsi_avg=3, tolerance=1e-6):
+    """
+    Bars of look-back to compute before a page so its indicators match the
+    full-history values.
+
+    SMA_5, SMA_20 and RSI_Avg only look back a fixed number of bars and are
+    exact once the margin covers them. RSI is recursive: when the history
+    before the margin is dropped, its share of the weight in both the up and
+    down RMA averages after k bars is at most (1 - 1/rsi_period) ** k. RSI is
+    a weighted mediant of the windowed and dropped parts, so it moves by at
+    most ~100 * that share * (old volatility / window volatility) points.
+    The returned margin keeps the share below `tolerance` (1e-6 → about
+    13.8 * rsi_period bars, i.e. 125 bars for RSI(9)).
+    """
+    decay = 1.0 - 1.0 / rsi_period
+    k = 0 if decay <= 0 else int(np.ceil(np.log(tolerance) / np.log(decay)))
+    fixed = max(20, rsi_period + rsi_avg)
+    return max(k, 0) + fixed
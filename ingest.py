@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from partitionStore import read_all, read_partition, write_partition
+
+TXT_COLUMNS = ["Symbol", "Date", "Time", "Open", "High", "Low", "Close", "X1", "X2"]
+OHLC = ["Open", "High", "Low", "Close"]
+MANIFEST_FILE = "manifest.json"
+
+
+def file_fingerprint(path, with_hash=True):
+    """(size, mtime_ns, sha1) of a file; hashing is skipped when with_hash=False."""
+    st = path.stat()
+    fp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if with_hash:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        fp["sha1"] = h.hexdigest()
+    return fp
+
+
+def parse_nifty_txt(path):
+    """Parse one monthly NIFTY .txt file (newest-first rows) into sorted Datetime + OHLC."""
+    df = pd.read_csv(
+        path,
+        header=None,
+        names=TXT_COLUMNS,
+        usecols=["Date", "Time"] + OHLC,
+        dtype={"Date": str, "Time": str},
+    )
+    # explicit format: no per-row format inference
+    df["Datetime"] = pd.to_datetime(df["Date"] + df["Time"], format="%Y%m%d%H:%M")
+    return df[["Datetime"] + OHLC].sort_values("Datetime", kind="stable").reset_index(drop=True)
+
+
+def _write_manifest(manifest_file, entries):
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=manifest_file.parent, prefix=f".{manifest_file.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"files": entries}, f, indent=1)
+        os.replace(tmp, manifest_file)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def load_manifest(manifest_file):
+    try:
+        with open(manifest_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}}
+
+
+def store_version(store_dir):
+    """
+    Content version of the store: a digest of the source files' sha1s in its
+    manifest. Touching a file or re-checking leaves it unchanged; any worker
+    that ingests new content changes it for all of them.
+    """
+    files = load_manifest(Path(store_dir) / MANIFEST_FILE).get("files", {})
+    signature = sorted((name, entry.get("sha1")) for name, entry in files.items())
+    return hashlib.sha1(json.dumps(signature).encode()).hexdigest()[:16]
+
+
+def ingest_nifty_txt_files(data_dir, store_dir, max_workers=None, read=True):
+    """
+    Bring the partitioned candle store up to date with the monthly .txt files.
+
+    A manifest in the store records each file's size, mtime, sha1 and the
+    time range it contributed. Only new or changed files are parsed (in a
+    process pool when there are several), and only the month partitions
+    their old or new rows touch are rewritten. Unchanged files are never
+    re-read. Returns (combined_df, changed_file_names, removed_file_names);
+    with read=False the store is only updated and combined_df is None
+    (callers that need a date range use partitionStore.read_range).
+    """
+    data_dir = Path(data_dir)
+    store_dir = Path(store_dir)
+    manifest_file = store_dir / MANIFEST_FILE
+
+    all_files = sorted(data_dir.glob("*.txt"))
+    if not all_files:
+        raise FileNotFoundError(f"No .txt files found in {data_dir} folder")
+
+    manifest = load_manifest(manifest_file)
+    old_entries = manifest.get("files", {})
+    entries = {}
+    changed = []
+    for path in all_files:
+        old = old_entries.get(path.name)
+        fp = file_fingerprint(path, with_hash=False)
+        if old and old["size"] == fp["size"] and old["mtime_ns"] == fp["mtime_ns"]:
+            entries[path.name] = old
+            continue
+        fp = file_fingerprint(path)
+        if old and old.get("sha1") == fp["sha1"]:
+            # touched but identical content
+            entries[path.name] = {**old, **fp}
+            continue
+        entries[path.name] = fp
+        changed.append(path)
+
+    removed = [name for name in old_entries if name not in entries]
+    if not changed and not removed:
+        # rewrite even when unchanged: the manifest mtime marks the last check
+        _write_manifest(manifest_file, entries)
+        return (read_all(store_dir) if read else None), [], []
+
+    # --- parse changed files (in parallel when it pays off) ---
+    if len(changed) > 1:
+        workers = max_workers or min(len(changed), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = list(pool.map(parse_nifty_txt, changed))
+    else:
+        parsed = [parse_nifty_txt(p) for p in changed]
+
+    stale = [old_entries[p.name] for p in changed if p.name in old_entries]
+    stale += [old_entries[name] for name in removed]
+    stale = [(pd.Timestamp(e["start"]), pd.Timestamp(e["end"])) for e in stale if e.get("start")]
+
+    for path, df in zip(changed, parsed):
+        entries[path.name]["rows"] = len(df)
+        entries[path.name]["start"] = df["Datetime"].iloc[0].isoformat() if len(df) else None
+        entries[path.name]["end"] = df["Datetime"].iloc[-1].isoformat() if len(df) else None
+
+    # --- rewrite only the month partitions touched by stale or fresh rows ---
+    fresh = {}
+    for df in parsed:
+        for month, part in df.groupby(df["Datetime"].dt.strftime("%Y-%m")):
+            fresh.setdefault(month, []).append(part)
+    months = set(fresh)
+    for lo, hi in stale:
+        months.update(m.strftime("%Y-%m") for m in pd.period_range(lo, hi, freq="M"))
+
+    for month in sorted(months):
+        pieces = list(fresh.get(month, []))
+        existing = read_partition(store_dir, month)
+        if existing is not None:
+            for lo, hi in stale:
+                existing = existing[(existing["Datetime"] < lo) | (existing["Datetime"] > hi)]
+            pieces.insert(0, existing)
+        part = None
+        if pieces:
+            part = (
+                pd.concat(pieces, ignore_index=True)
+                .sort_values("Datetime", kind="stable")
+                .drop_duplicates(subset="Datetime")
+            )
+        write_partition(store_dir, month, part)
+
+    _write_manifest(manifest_file, entries)
+    return (read_all(store_dir) if read else None), [p.name for p in changed], removed
@@ -0,0 +1,237 @@
+import io
+import json
+import os
+import queue
+import threading
+import time
+
+import pandas as pd
+
+from ingest import parse_nifty_txt
+
+HEARTBEAT_SECONDS = 15
+QUEUE_SIZE = 256
+# Columnar payload arrays that run parallel to "time"
+SERIES_KEYS = ("open", "high", "low", "close", "sma5", "sma20", "rsi_base", "rsi_avg")
+
+
+def merge_payloads(payloads):
+    """Fold several columnar deltas into one, the latest value winning per bar time."""
+    if len(payloads) == 1:
+        return payloads[0]
+    rows, markers = {}, {}
+    for p in payloads:
+        for i, t in enumerate(p["time"]):
+            rows[t] = [p[k][i] for k in SERIES_KEYS]
+        for m in p.get("signals", []):
+            markers[m["time"]] = m
+    times = sorted(rows)
+    merged = dict(payloads[-1])
+    merged["time"] = times
+    for j, k in enumerate(SERIES_KEYS):
+        merged[k] = [rows[t][j] for t in times]
+    merged["signals"] = [markers[t] for t in sorted(markers)]
+    return merged
+
+
+class Subscription:
+    """One client's bounded queue of payloads on a channel."""
+
+    def __init__(self, channel, size=QUEUE_SIZE):
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=size)
+
+    def push(self, payload):
+        try:
+            self.queue.put_nowait(payload)
+        except queue.Full:
+            # too slow to keep up: drop the backlog and make the client reload
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.queue.put_nowait({"resync": True})
+
+
+class Channel:
+    """Shared state for every subscriber of one (interval, RSI, marker range) key."""
+
+    def __init__(self, key, version, last_time):
+        self.key = key
+        self.version = version
+        self.last_time = last_time
+        self.subscribers = set()
+        self.thread = None
+        self.pushes = 0
+
+
+class BarBroadcaster:
+    """
+    Fan-out of new and updated bars to streaming clients.
+
+    Subscribers are grouped into channels by key. Each channel has one
+    thread that waits for the candle store to publish a new data version,
+    computes the delta since the last bar it pushed once (bars, indicator
+    points and markers via `compute(snapshot, key, since)`), and puts the
+    same payload on every subscriber's queue, so N clients cost one
+    computation. The thread exits when its last subscriber leaves.
+    """
+
+    def __init__(self, store, compute, last_time, heartbeat=HEARTBEAT_SECONDS):
+        self._store = store
+        self._compute = compute
+        self._last_time = last_time  # (snapshot, key) -> epoch second of the newest bar
+        self._heartbeat = heartbeat
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, key, since=None):
+        """Join (or open) the channel for key; bars newer than `since` are sent first."""
+        snapshot = self._store.get()
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = Channel(key, snapshot.version, self._last_time(snapshot, key))
+                self._channels[key] = channel
+            sub = Subscription(channel)
+            channel.subscribers.add(sub)
+            if channel.thread is None:
+                channel.thread = threading.Thread(target=self._run, args=(channel,), daemon=True,
+                                                  name=f"stream-{key}")
+                channel.thread.start()
+        if since is not None:
+            # catch-up for bars the client missed between its page load and now
+            payload = self._compute(snapshot, key, since)
+            if payload["time"]:
+                sub.push(payload)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            sub.channel.subscribers.discard(sub)
+
+    def _run(self, channel):
+        while True:
+            snapshot = self._store.wait_for_version(channel.version, timeout=self._heartbeat)
+            with self._lock:
+                if not channel.subscribers:
+                    channel.thread = None
+                    self._channels.pop(channel.key, None)
+                    return
+            if snapshot is None or snapshot.version <= channel.version:
+                continue
+            latest = self._last_time(snapshot, channel.key)
+            if latest < channel.last_time:
+                # history moved backwards (refresh, replay restart): clients reload
+                channel.version, channel.last_time = snapshot.version, latest
+                self._push(channel, {"resync": True})
+                continue
+            payload = self._compute(snapshot, channel.key, channel.last_time)
+            channel.version = snapshot.version
+            if not payload["time"]:
+                continue
+            channel.last_time = payload["time"][-1]
+            self._push(channel, payload)
+
+    def _push(self, channel, payload):
+        channel.pushes += 1
+        with self._lock:
+            subscribers = list(channel.subscribers)
+        for sub in subscribers:
+            sub.push(payload)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "channels": len(self._channels),
+                "subscribers": sum(len(c.subscribers) for c in self._channels.values()),
+                "pushes": sum(c.pushes for c in self._channels.values()),
+            }
+
+
+def sse_events(broadcaster, sub, throttle=0.0, heartbeat=HEARTBEAT_SECONDS):
+    """
+    Server-sent events for one subscription. With throttle > 0 the deltas
+    arriving within that many seconds are merged into a single event.
+    """
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                payload = sub.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            batch = [payload]
+            deadline = time.monotonic() + throttle
+            while not payload.get("resync") and time.monotonic() < deadline:
+                try:
+                    payload = sub.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                batch.append(payload)
+            if any(p.get("resync") for p in batch):
+                yield "event: resync\ndata: {}\n\n"
+                continue
+            yield f"data: {json.dumps(merge_payloads(batch), separators=(',', ':'))}\n\n"
+    finally:
+        broadcaster.unsubscribe(sub)
+
+
+class FileTailFeed:
+    """
+    Live source for testing without a market connection: tails a text file
+    in the monthly NIFTY .txt format (one bar per line, appended in time
+    order) and appends every complete new line to the candle store.
+    """
+
+    def __init__(self, path, store, poll=1.0, from_start=False):
+        self.path = path
+        self.store = store
+        self.poll = poll
+        self._offset = 0 if from_start or not os.path.exists(path) else os.path.getsize(path)
+        self._stop = threading.Event()
+        self.bars = 0
+
+    def poll_once(self):
+        """Ingest the complete lines appended since the last poll; returns the bar count."""
+        if not os.path.exists(self.path):
+            return 0
+        if os.path.getsize(self.path) < self._offset:
+            self._offset = 0  # truncated / rotated
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1
+        if not end:
+            return 0
+        self._offset += end
+        bars = parse_nifty_txt(io.StringIO(chunk[:end].decode()))
+        if bars.empty:
+            return 0
+        self.store.append(bars)
+        self.bars += len(bars)
+        return len(bars)
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Tail feed error on {self.path}: {e}")
+            self._stop.wait(self.poll)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True, name="tail-feed").start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def latest_bar_time(level):
+    """Epoch second of the newest bar in a level frame (0 when empty)."""
+    if not len(level):
+        return 0
+    return int(pd.Timestamp(level.index[-1]).timestamp())
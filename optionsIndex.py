@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+# Contract identity is parsed once per distinct symbol, e.g. "NIFTY23DEC21400CE",
+# "21400 CE", "21400-PE.NFO"
+SYMBOL_PATTERN = r"(?P<strike>\d{4,6})\s*(?P<opt_type>CE|PE)\b"
+SYMBOL_COLUMNS = ("symbol", "ticker", "instrument", "name")
+OHLC = ["Open", "High", "Low", "Close"]
+
+
+def _find_column(columns, match):
+    for c in columns:
+        if match(c.lower()):
+            return c
+    return None
+
+
+def parse_symbols(values):
+    """
+    (strike, opt_type) arrays for a column of contract symbols. The regex
+    runs over the distinct values only and the result is mapped back with
+    the category codes; unparseable symbols get strike -1 / type None.
+    """
+    cat = pd.Categorical(values)
+    cats = pd.Series(cat.categories.astype(str)).str.upper().str.replace(r"[-_]", " ", regex=True)
+    parsed = cats.str.extract(SYMBOL_PATTERN)
+    strikes = pd.to_numeric(parsed["strike"], errors="coerce").fillna(-1).astype(np.int64).to_numpy()
+    types = parsed["opt_type"].to_numpy(dtype=object)
+    codes = cat.codes
+    strike = np.where(codes >= 0, strikes[codes], -1)
+    opt_type = np.where(codes >= 0, types[codes], None)
+    return strike, opt_type
+
+
+def contract_columns(df):
+    """
+    (expiry, strike, opt_type) arrays for every row of a combined options
+    frame, from explicit strike/type/expiry columns or a symbol column.
+    Returns None when the frame carries no contract identity at all.
+    """
+    cols = list(df.columns)
+    strike_col = _find_column(cols, lambda c: "strike" in c)
+    type_col = _find_column(cols, lambda c: c in ("optiontype", "option_type", "optype", "opt_type", "type"))
+    symbol_col = _find_column(cols, lambda c: c in SYMBOL_COLUMNS)
+    expiry_col = _find_column(cols, lambda c: "expiry" in c)
+
+    if strike_col is not None and type_col is not None:
+        strike = pd.to_numeric(df[strike_col], errors="coerce").fillna(-1).astype(np.int64).to_numpy()
+        opt_type = df[type_col].astype(str).str.upper().str.extract(r"(CE|PE)")[0].to_numpy(dtype=object)
+    elif symbol_col is not None:
+        strike, opt_type = parse_symbols(df[symbol_col])
+    else:
+        return None
+
+    if expiry_col is not None:
+        expiry = pd.to_datetime(df[expiry_col], errors="coerce").dt.normalize().to_numpy()
+    else:
+        expiry = np.full(len(df), np.datetime64("NaT"), dtype="datetime64[ns]")
+    return expiry, strike, opt_type
+
+
+class OptionsIndex:
+    """
+    One-time index over a combined options frame.
+
+    Rows are sorted by (expiry, strike, opt_type, Datetime) so every
+    contract is one contiguous block; a dict maps each contract to its
+    (start, stop) rows, and the day inside a block is found by binary
+    search on the timestamps. Lookups return slices of one sorted OHLC
+    frame, without copying or re-scanning the data.
+    """
+
+    def __init__(self, frame, contracts):
+        self.frame = frame
+        self._times = frame.index.values
+        self._blocks = contracts
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a Datetime-indexed (or Datetime-column) frame; None if it has no contract columns."""
+        if not isinstance(df.index, pd.DatetimeIndex):
+            dt_col = _find_column(df.columns, lambda c: c in ("datetime", "timestamp", "date", "time"))
+            if dt_col is None:
+                return None
+            df = df.set_index(pd.DatetimeIndex(pd.to_datetime(df[dt_col]), name="Datetime")).drop(columns=dt_col)
+        ident = contract_columns(df)
+        if ident is None:
+            return None
+        expiry, strike, opt_type = ident
+        ohlc = [c for c in OHLC if c in df.columns]
+
+        valid = (strike >= 0) & pd.notna(opt_type)
+        keys = pd.DataFrame({
+            "expiry": expiry[valid],
+            "strike": strike[valid],
+            "opt_type": pd.Categorical(opt_type[valid], categories=["CE", "PE"]),
+            "Datetime": df.index.values[valid],
+        })
+        order = np.lexsort((
+            keys["Datetime"].to_numpy(),
+            keys["opt_type"].cat.codes.to_numpy(),
+            keys["strike"].to_numpy(),
+            keys["expiry"].to_numpy().astype(np.int64),
+        ))
+        keys = keys.iloc[order].reset_index(drop=True)
+        frame = df[ohlc].iloc[np.flatnonzero(valid)[order]].astype(np.float64)
+
+        # block boundaries wherever the contract key changes
+        exp = keys["expiry"].to_numpy()
+        exp_ns = exp.astype(np.int64)  # NaT compares equal to itself as int
+        stk = keys["strike"].to_numpy()
+        typ = keys["opt_type"].cat.codes.to_numpy()
+        change = np.ones(len(keys), dtype=bool)
+        change[1:] = (exp_ns[1:] != exp_ns[:-1]) | (stk[1:] != stk[:-1]) | (typ[1:] != typ[:-1])
+        starts = np.flatnonzero(change)
+        stops = np.append(starts[1:], len(keys))
+        contracts = {}
+        for a, b in zip(starts.tolist(), stops.tolist()):
+            e = pd.Timestamp(exp[a])
+            contracts[(None if pd.isna(e) else e.date(), int(stk[a]), keys["opt_type"].iat[a])] = (a, b)
+        return cls(frame, contracts)
+
+    @classmethod
+    def from_parquet(cls, path):
+        return cls.from_frame(pd.read_parquet(path))
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def contracts(self):
+        """Sorted list of (expiry, strike, opt_type) keys; expiry is None when unknown."""
+        return list(self._blocks)
+
+    def expiries(self):
+        return sorted({k[0] for k in self._blocks if k[0] is not None})
+
+    def _block(self, strike, opt_type, expiry):
+        opt_type = str(opt_type).upper()
+        if expiry is not None:
+            block = self._blocks.get((pd.Timestamp(expiry).date(), int(strike), opt_type))
+            if block is not None:
+                return block
+        # data without an expiry column is keyed by strike/type only
+        return self._blocks.get((None, int(strike), opt_type))
+
+    def lookup(self, strike, opt_type, expiry=None, start=None, end=None):
+        """
+        OHLC rows of one contract with start <= Datetime < end (bounds
+        optional), or None when the contract is not in the index.
+        """
+        block = self._block(strike, opt_type, expiry)
+        if block is None:
+            return None
+        a, b = block
+        times = self._times[a:b]
+        lo = a + (int(np.searchsorted(times, np.datetime64(pd.Timestamp(start)), side="left")) if start is not None else 0)
+        hi = a + (int(np.searchsorted(times, np.datetime64(pd.Timestamp(end)), side="left")) if end is not None else b - a)
+        return self.frame.iloc[lo:hi]
+
+    def day(self, strike, opt_type, expiry, day):
+        """One contract's rows for a calendar day."""
+        day = pd.Timestamp(day).normalize()
+        return self.lookup(strike, opt_type, expiry, day, day + pd.Timedelta(days=1))
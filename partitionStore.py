@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# One parquet file per calendar month, sorted by Datetime. Row groups of
+# about a week of 1-minute bars keep min/max statistics tight enough for
+# day-range reads to skip most of a partition.
+ROW_GROUP_SIZE = 2000
+PARTITION_FILE = "candles.parquet"
+COLUMNS = ["Datetime", "Open", "High", "Low", "Close"]
+
+
+def month_key(ts):
+    return pd.Timestamp(ts).strftime("%Y-%m")
+
+
+def partition_path(store_dir, month):
+    return Path(store_dir) / f"month={month}" / PARTITION_FILE
+
+
+def list_partitions(store_dir):
+    """{month: path} for every partition present on disk."""
+    out = {}
+    for p in sorted(Path(store_dir).glob(f"month=*/{PARTITION_FILE}")):
+        out[p.parent.name.split("=", 1)[1]] = p
+    return out
+
+
+def write_partition(store_dir, month, df):
+    """Atomically replace (or remove, when df is empty) one month partition."""
+    path = partition_path(store_dir, month)
+    if df is None or df.empty:
+        if path.parent.exists():
+            shutil.rmtree(path.parent)
+        return None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df = df.sort_values("Datetime", kind="stable").reset_index(drop=True)
+    # unique temp name: several processes may ingest at the same startup
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp, index=False, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return path
+
+
+def write_partitions(store_dir, df):
+    """Split a Datetime + OHLC frame by month and write each partition."""
+    months = df["Datetime"].dt.strftime("%Y-%m")
+    for month, part in df.groupby(months, sort=True):
+        write_partition(store_dir, month, part)
+
+
+def read_partition(store_dir, month):
+    path = partition_path(store_dir, month)
+    return pd.read_parquet(path) if path.exists() else None
+
+
+def read_range(store_dir, start=None, end=None, columns=None):
+    """
+    Rows with start <= Datetime < end (either bound optional), sorted.
+
+    Partitions outside the range are never opened; inside the chosen files
+    the filters are pushed down to pyarrow, which skips row groups whose
+    Datetime min/max statistics fall outside the range.
+    """
+    parts = list_partitions(store_dir)
+    lo = pd.Timestamp(start) if start is not None else None
+    hi = pd.Timestamp(end) if end is not None else None
+    files = [
+        str(path) for month, path in parts.items()
+        if (lo is None or month >= month_key(lo)) and (hi is None or month <= month_key(hi))
+    ]
+    if not files:
+        return pd.DataFrame(columns=columns or COLUMNS)
+
+    filters = []
+    if lo is not None:
+        filters.append(("Datetime", ">=", lo))
+    if hi is not None:
+        filters.append(("Datetime", "<", hi))
+    # partitioning=None: the month= directory name is not a data column
+    df = pd.read_parquet(files, columns=columns or COLUMNS, filters=filters or None, partitioning=None)
+    return df.sort_values("Datetime", kind="stable").reset_index(drop=True)
+
+
+def read_all(store_dir):
+    return read_range(store_dir)
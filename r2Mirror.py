@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Remote layout: <prefix>/<expiry>/<strike><type>.parquet[.gz] (sometimes "<strike> <type>")
+# Local layout mirrors the key under data/, so the per-strike file candidates
+# in finalExcel.load_strike_data_local find mirrored files directly.
+MIRROR_ROOT = Path("data")
+MIRROR_MANIFEST = ".mirror.json"  # per expiry folder: file name -> {"etag", "size"}
+PARQUET_SUFFIXES = (".parquet", ".parquet.gz")
+
+
+def contract_file_names(strike, opt_type):
+    """Remote file names a contract may be stored under, in order of preference."""
+    return [
+        f"{strike}{opt_type}.parquet.gz",
+        f"{strike}{opt_type}.parquet",
+        f"{strike} {opt_type}.parquet.gz",
+        f"{strike} {opt_type}.parquet",
+    ]
+
+
+def _etag(info):
+    """ETag of an ls() entry without quotes; s3fs spells the key either way."""
+    tag = info.get("ETag") or info.get("etag") or ""
+    return str(tag).strip('"')
+
+
+class R2Mirror:
+    """
+    Local copy of the R2 option-contract parquet files.
+
+    Each expiry folder is listed once per mirror (one ls call with sizes and
+    ETags). Wanted contracts are resolved against that listing instead of
+    probing path variants one by one, and downloaded concurrently by a
+    bounded thread pool with retries. A file is fetched again only when its
+    size or ETag no longer matches what the folder's manifest recorded.
+    """
+
+    def __init__(self, fs, prefix, root=MIRROR_ROOT, max_workers=8, retries=3, backoff=0.5):
+        self.fs = fs
+        self.prefix = prefix.rstrip("/")
+        self.root = Path(root)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self._listings = {}
+        self._expiries = None
+        self._lock = threading.Lock()
+        self.downloaded = self.reused = self.failed = 0
+
+    # ---- remote listing ----
+    def listing(self, expiry):
+        """{file name: ls info} for one expiry folder, listed once."""
+        with self._lock:
+            if expiry in self._listings:
+                return self._listings[expiry]
+        try:
+            entries = self.fs.ls(f"{self.prefix}/{expiry}", detail=True)
+        except (FileNotFoundError, OSError) as e:
+            logger.debug("Cannot list %s/%s: %s", self.prefix, expiry, e)
+            entries = []
+        files = {
+            Path(info["name"]).name: info
+            for info in entries
+            if info.get("type", "file") == "file" and info["name"].endswith(PARQUET_SUFFIXES)
+        }
+        with self._lock:
+            self._listings[expiry] = files
+        return files
+
+    def expiries(self):
+        """Sorted expiry dates that have a folder under the prefix, listed once."""
+        with self._lock:
+            if self._expiries is not None:
+                return self._expiries
+        try:
+            entries = self.fs.ls(self.prefix, detail=True)
+        except (FileNotFoundError, OSError) as e:
+            logger.warning("Cannot list expiries under %s: %s", self.prefix, e)
+            entries = []
+        found = set()
+        for info in entries:
+            if info.get("type") != "directory":
+                continue
+            try:
+                found.add(date.fromisoformat(Path(info["name"]).name))
+            except ValueError:
+                continue
+        with self._lock:
+            self._expiries = sorted(found)
+        return self._expiries
+
+    def resolve(self, strike, opt_type, expiry):
+        """(remote key, ls info) for a contract, or None when the folder does not have it."""
+        files = self.listing(expiry)
+        for name in contract_file_names(strike, opt_type):
+            if name in files:
+                return files[name]["name"], files[name]
+        return None
+
+    # ---- local side ----
+    def local_path(self, key):
+        return self.root / key.split("://", 1)[-1]
+
+    def _manifest_file(self, path):
+        return path.parent / MIRROR_MANIFEST
+
+    def _read_manifest(self, path):
+        try:
+            return json.loads(self._manifest_file(path).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _record(self, path, info):
+        # serialised: every file of an expiry folder shares one manifest
+        with self._lock:
+            manifest = self._read_manifest(path)
+            manifest[path.name] = {"etag": _etag(info), "size": info.get("size")}
+            tmp = self._manifest_file(path).with_suffix(".tmp")
+            tmp.write_text(json.dumps(manifest, indent=1))
+            os.replace(tmp, self._manifest_file(path))
+
+    def is_current(self, path, info):
+        """True when the local copy matches the remote size and ETag."""
+        if not path.exists():
+            return False
+        seen = self._read_manifest(path).get(path.name)
+        if not seen or path.stat().st_size != info.get("size"):
+            return False
+        return seen.get("etag") == _etag(info)
+
+    def _download(self, key, info):
+        path = self.local_path(key)
+        if self.is_current(path, info):
+            with self._lock:
+                self.reused += 1
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.part")
+        for attempt in range(1, self.retries + 1):
+            try:
+                self.fs.get_file(key, str(tmp))
+                size = tmp.stat().st_size
+                if info.get("size") is not None and size != info["size"]:
+                    raise OSError(f"size mismatch for {key}: {size} != {info['size']}")
+                os.replace(tmp, path)
+                self._record(path, info)
+                with self._lock:
+                    self.downloaded += 1
+                return path
+            except Exception as e:
+                logger.warning("Download %s failed (attempt %d/%d): %s", key, attempt, self.retries, e)
+                if tmp.exists():
+                    tmp.unlink()
+                if attempt < self.retries:
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+        with self._lock:
+            self.failed += 1
+        return None
+
+    # ---- public API ----
+    def ensure(self, strike, opt_type, expiry):
+        """Local path of one contract, downloading it if needed; None if unavailable."""
+        found = self.resolve(strike, opt_type, expiry)
+        return self._download(*found) if found else None
+
+    def prefetch(self, contracts):
+        """
+        Mirror many (strike, opt_type, expiry) contracts concurrently.
+        Returns {contract: local path or None}.
+        """
+        contracts = list(dict.fromkeys(contracts))
+        for expiry in dict.fromkeys(c[2] for c in contracts):
+            self.listing(expiry)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="r2") as pool:
+            paths = list(pool.map(lambda c: self.ensure(*c), contracts))
+        logger.info("Mirror prefetch: %s", self.stats())
+        return dict(zip(contracts, paths))
+
+    def stats(self):
+        return {
+            "expiry_folders": len(self._expiries or ()),
+            "listed_expiries": len(self._listings),
+            "downloaded": self.downloaded,
+            "reused": self.reused,
+            "failed": self.failed,
+        }
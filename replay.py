@@ -0,0 +1,260 @@
+import argparse
+import heapq
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ingest import OHLC
+
+DATA_DIR = Path("data")
+TXT_PATTERN = "2023 * NIFTY.txt"
+BLOCK_SIZE = 1 << 16
+MAX_BATCH = 500  # bars per store append when the replay is behind schedule
+MAX_STEP = 60.0  # market seconds: overnight / weekend gaps replay as one bar step
+SENT_HISTORY = 4096  # versions remembered for latency lookups
+
+
+# -------------------- Reading the monthly files --------------------
+def parse_line(line):
+    """(datetime, open, high, low, close) from one 'NIFTY,20231229,15:29,o,h,l,c,..' line, or None."""
+    parts = line.split(",")
+    if len(parts) < 7:
+        return None
+    d, t = parts[1].strip(), parts[2].strip()
+    try:
+        ts = datetime(int(d[:4]), int(d[4:6]), int(d[6:8]), int(t[:2]), int(t[3:5]))
+        return (ts, float(parts[3]), float(parts[4]), float(parts[5]), float(parts[6]))
+    except ValueError:
+        return None
+
+
+def _lines_forward(path):
+    with open(path, "rb") as f:
+        for raw in f:
+            yield raw.decode().strip()
+
+
+def _lines_backward(path, block=BLOCK_SIZE):
+    """Lines of a file last to first, reading fixed-size blocks from the end."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step) + tail
+            lines = chunk.split(b"\n")
+            tail = lines[0]  # may continue in the previous block
+            for raw in reversed(lines[1:]):
+                yield raw.decode().strip()
+        yield tail.decode().strip()
+
+
+def _edge_bars(path):
+    """First and last parseable bars of a file, reading only its two ends."""
+    first = next((b for b in map(parse_line, _lines_forward(path)) if b), None)
+    last = next((b for b in map(parse_line, _lines_backward(path)) if b), None)
+    return first, last
+
+
+def file_bars(path):
+    """
+    Bars of one monthly file in ascending time. The files are written
+    newest-first, so those are read backwards block by block; a file that
+    is already ascending is read forwards. Neither loads the whole file.
+    """
+    first, last = _edge_bars(path)
+    if first is None:
+        return
+    lines = _lines_backward(path) if first[0] > last[0] else _lines_forward(path)
+    for line in lines:
+        bar = parse_line(line)
+        if bar is not None:
+            yield bar
+
+
+def replay_bars(files, start=None, end=None):
+    """Bars of several monthly files merged into one ascending stream, within [start, end]."""
+    start = pd.Timestamp(start).to_pydatetime() if start is not None else None
+    end = pd.Timestamp(end).to_pydatetime() if end is not None else None
+    streams = []
+    for path in files:
+        first, last = _edge_bars(path)
+        if first is None:
+            continue
+        lo, hi = min(first[0], last[0]), max(first[0], last[0])
+        if (end is not None and lo > end) or (start is not None and hi < start):
+            continue  # month entirely outside the window: never read past its ends
+        streams.append(file_bars(path))
+    for bar in heapq.merge(*streams, key=lambda b: b[0]):
+        if start is not None and bar[0] < start:
+            continue
+        if end is not None and bar[0] > end:
+            return
+        yield bar
+
+
+def monthly_files(data_dir=DATA_DIR):
+    return sorted(Path(data_dir).glob(TXT_PATTERN))
+
+
+# -------------------- Replay --------------------
+class HistoricalReplay:
+    """
+    Simulated live feed from the monthly NIFTY .txt files.
+
+    Bars are streamed in timestamp order and appended to the candle store,
+    the same ingestion path the tail feed uses, so the live stream,
+    indicator cache and delta endpoints see them as real-time data. The
+    first append rewinds the store to the replay start.
+
+    `speed` is a market-time multiplier (1 = real time, 60 = one minute bar
+    per second) or None for as fast as the store accepts them. Gaps longer
+    than a bar (overnight, weekends) are replayed as a single bar step.
+    Bars that are already due go in one append of up to `max_batch` bars.
+    """
+
+    def __init__(self, store, files=None, speed=60.0, start=None, end=None, max_batch=MAX_BATCH):
+        self.store = store
+        self.files = list(files) if files is not None else monthly_files()
+        self.speed = speed
+        self.start_at = start
+        self.end_at = end
+        self.max_batch = max_batch
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.sent_at = {}  # data version -> wall time its bars were handed to the store
+        self.bars = self.appends = 0
+        self.market_seconds = 0.0
+        self.append_ms = deque(maxlen=SENT_HISTORY)
+        self.started = self.finished = None
+        self.last_bar = None
+
+    def _publish(self, batch):
+        frame = pd.DataFrame(batch, columns=["Datetime"] + OHLC)
+        sent = time.time()
+        t0 = time.perf_counter()
+        snap = self.store.append(frame)
+        elapsed = (time.perf_counter() - t0) * 1e3
+        with self._lock:
+            self.sent_at[snap.data_version] = sent
+            if len(self.sent_at) > SENT_HISTORY:
+                self.sent_at.pop(next(iter(self.sent_at)))
+            self.bars += len(batch)
+            self.appends += 1
+            self.append_ms.append(elapsed)
+            self.last_bar = batch[-1][0]
+
+    def run(self):
+        self.started = time.perf_counter()
+        bars = replay_bars(self.files, self.start_at, self.end_at)
+        batch, prev, due = [], None, 0.0  # due: market seconds since the first bar
+        for bar in bars:
+            if self._stop.is_set():
+                break
+            if prev is not None:
+                due += min((bar[0] - prev).total_seconds(), MAX_STEP)
+            prev = bar[0]
+            if self.speed:
+                wait = self.started + due / self.speed - time.perf_counter()
+                if wait > 0:
+                    # on schedule: publish what is due, then sleep until this bar is
+                    if batch:
+                        self._publish(batch)
+                        batch = []
+                        wait = self.started + due / self.speed - time.perf_counter()
+                    self._stop.wait(max(wait, 0.0))
+            batch.append(bar)
+            self.market_seconds = due
+            if len(batch) >= self.max_batch:
+                self._publish(batch)
+                batch = []
+        if batch:
+            self._publish(batch)
+        self.finished = time.perf_counter()
+        print(f"🏁 Replay finished: {self.stats()}")
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True, name="replay-feed").start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def latency(self, payload, received=None):
+        """Seconds from handing a payload's data version to the store until `received` (default now)."""
+        sent = self.sent_at.get(payload.get("data_version"))
+        if sent is None:
+            return None
+        return (time.time() if received is None else received) - sent
+
+    def stats(self):
+        with self._lock:
+            append_ms = np.asarray(self.append_ms) if self.append_ms else np.zeros(1)
+            end = self.finished or time.perf_counter()
+            wall = end - self.started if self.started else 0.0
+            return {
+                "bars": self.bars,
+                "appends": self.appends,
+                "wall_seconds": round(wall, 3),
+                "bars_per_sec": round(self.bars / wall, 1) if wall else 0.0,
+                "achieved_speed": round(self.market_seconds / wall, 1) if wall else 0.0,
+                "append_ms_p50": round(float(np.percentile(append_ms, 50)), 2),
+                "append_ms_p95": round(float(np.percentile(append_ms, 95)), 2),
+                "last_bar": str(self.last_bar) if self.last_bar else None,
+                "running": self.started is not None and self.finished is None,
+            }
+
+
+def parse_speed(text):
+    """'max' -> None, '60x' / '60' -> 60.0."""
+    text = str(text).strip().lower()
+    if text in ("max", "0", ""):
+        return None
+    return float(text[:-1] if text.endswith("x") else text)
+
+
+if __name__ == "__main__":
+    # End-to-end run against the server's store, indicator cache and live stream
+    import app as server
+
+    parser = argparse.ArgumentParser(description="Replay the monthly NIFTY files as a live feed.")
+    parser.add_argument("--speed", default="max", help="1, 60, 60x or max")
+    parser.add_argument("--start", default="2023-12-01")
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--clients", type=int, default=1)
+    args = parser.parse_args()
+
+    server.candle_store.get()
+    replay = HistoricalReplay(server.candle_store, speed=parse_speed(args.speed), start=args.start, end=args.end)
+    key = (args.interval, 9, 3, None, None)
+    subs = [server.live_stream.subscribe(key) for _ in range(args.clients)]
+    latencies = []
+
+    def drain(sub):
+        while True:
+            payload = sub.queue.get()
+            if payload.get("resync"):
+                continue
+            lat = replay.latency(payload)
+            if lat is not None:
+                latencies.append(lat)
+
+    for sub in subs:
+        threading.Thread(target=drain, args=(sub,), daemon=True).start()
+    print(f"▶️ Replaying from {args.start} at {args.speed} to {args.clients} client(s) on {args.interval}")
+    replay.run()
+    time.sleep(0.5)  # let the last push reach the clients
+    lat = np.asarray(latencies) * 1e3 if latencies else np.zeros(1)
+    print(f"📊 {replay.stats()}")
+    print(f"⏱️ ingest→indicator→client latency over {len(latencies)} pushes: "
+          f"p50 {np.percentile(lat, 50):.1f} ms, p95 {np.percentile(lat, 95):.1f} ms, max {lat.max():.1f} ms")
@@ -0,0 +1,124 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+from exportJobs import write_atomic
+
+# Default windows, as the chart has always used them
+SIGNAL_START, SIGNAL_END = "2023-12-01", "2023-12-31"  # buy/sell markers
+ENTRY_DAY = "2023-12-26"  # entry-point export
+
+ENTRY_COLUMNS = ["Type", "Time", "EntryPrice", "ClosePrice"]
+
+# Typed schema for the columnar (parquet) entry-point hand-off to the backtester
+ENTRY_DTYPES = {"Type": "category", "Time": "datetime64[ns]", "EntryPrice": "float64", "ClosePrice": "float64"}
+NS_PER_DAY = 86_400_000_000_000
+
+
+def crossover_signals(rsi_diff):
+    """
+    "buy" where RSI crosses above its average, "sell" where it crosses below,
+    None elsewhere; computed with one shifted array over the whole series.
+    """
+    diff = np.asarray(rsi_diff, dtype=np.float64)
+    prev = np.empty_like(diff)
+    prev[:1] = np.nan
+    prev[1:] = diff[:-1]
+    out = np.full(len(diff), None, dtype=object)
+    out[(diff > 0) & (prev <= 0)] = "buy"
+    out[(diff < 0) & (prev >= 0)] = "sell"
+    return out
+
+
+def compute_indicator_frame(df, rsi_period=9, rsi_avg=3):
+    """
+    Add SMA/RSI columns and buy/sell crossover signals to an OHLC frame.
+    The result references the input's OHLC arrays (possibly a shared
+    read-only mapping) and holds only the indicator columns itself.
+    """
+    df = df.copy(deep=False)
+
+    df["SMA_5"] = ta.sma(df["Close"], length=5)
+    df["SMA_20"] = ta.sma(df["Close"], length=20)
+    df["RSI_Base"] = ta.rsi(df["Close"], length=rsi_period)
+    df["RSI_Avg"] = ta.sma(df["RSI_Base"], length=rsi_avg)
+
+    return mark_crossovers(df)
+
+
+def mark_crossovers(df):
+    """Add RSI_Diff/Prev_Diff and the buy/sell crossover column for all history (in place)."""
+    df["RSI_Diff"] = df["RSI_Base"] - df["RSI_Avg"]
+    df["Prev_Diff"] = df["RSI_Diff"].shift(1)
+    df["Cross"] = crossover_signals(df["RSI_Diff"])
+    return df
+
+
+def range_slice(index, start=None, end=None):
+    """Positional slice of a sorted DatetimeIndex for [start, end] (date strings cover whole days)."""
+    return index.slice_indexer(start, end)
+
+
+def restrict_signals(index, signals, start=SIGNAL_START, end=SIGNAL_END):
+    """Keep markers only inside [start, end]; both bounds optional."""
+    out = np.full(len(index), None, dtype=object)
+    sl = range_slice(index, start, end)
+    out[sl] = np.asarray(signals, dtype=object)[sl]
+    return out
+
+
+def find_entry_points(df, start=ENTRY_DAY, end=ENTRY_DAY, signal_col="Cross"):
+    """
+    Entry points confirmed by two consecutive higher highs (after a buy
+    crossover) or lower lows (after a sell crossover) within the same day.
+
+    The signal bar is `first`, the next two bars `second`/`third`; the entry
+    is stamped at `third` with `second`'s High (CE) or Low (PE) as the entry
+    price. Evaluated for every bar in [start, end] at once with shifted
+    arrays. Returns a DataFrame with ENTRY_COLUMNS, in time order.
+    """
+    sl = range_slice(df.index, start, end)
+    part = df.iloc[sl]
+    n = len(part)
+    if n < 3:
+        return pd.DataFrame(columns=ENTRY_COLUMNS)
+
+    high = part["High"].to_numpy(dtype=np.float64)
+    low = part["Low"].to_numpy(dtype=np.float64)
+    close = part["Close"].to_numpy(dtype=np.float64)
+    signal = part[signal_col].to_numpy(dtype=object)
+    day = part.index.asi8 // NS_PER_DAY
+
+    # first = i, second = i + 1, third = i + 2 (all on the same day)
+    same_day = day[:-2] == day[2:]
+    sig = signal[:-2]
+    buy = same_day & (sig == "buy") & (high[1:-1] > high[:-2]) & (high[2:] > high[1:-1])
+    sell = same_day & (sig == "sell") & (low[1:-1] < low[:-2]) & (low[2:] < low[1:-1])
+
+    hits = np.flatnonzero(buy | sell)
+    is_buy = buy[hits]
+    second = hits + 1
+    entries = pd.DataFrame({
+        "Type": np.where(is_buy, "Buy CE", "Buy PE"),
+        "Time": part.index[hits + 2].strftime("%Y-%m-%d %H:%M:%S"),
+        "EntryPrice": [round(x, 2) for x in np.where(is_buy, high[second], low[second]).tolist()],
+        "ClosePrice": [round(x, 2) for x in close[second].tolist()],
+    })
+    return entries[ENTRY_COLUMNS]
+
+
+def write_entry_points(entries, path):
+    """Write entry points as typed parquet via temp file + rename."""
+    typed = entries[ENTRY_COLUMNS].astype(ENTRY_DTYPES)
+    write_atomic(path, lambda tmp: typed.to_parquet(tmp, index=False))
+    return Path(path)
+
+
+def read_entry_points(path):
+    """Entry points from parquet (typed) or, for older runs, the Excel sheet."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_excel(path).astype(ENTRY_DTYPES)
@@ -158,16 +158,50 @@ function setSeriesMarkers(markersArray) {
     console.warn('No supported markers API found (createSeriesMarkers / series.setMarkers). Markers were not set.');
 }
 
+// === Expand a columnar payload (?format=columnar) into per-series point arrays ===
+function expandColumnar(data) {
+    const time = data.time || [];
+    const points = (values, skipNull) => {
+        const out = [];
+        for (let i = 0; i < time.length; i++) {
+            const v = values[i];
+            if (skipNull && v === null) continue;
+            out.push({ time: time[i], value: v });
+        }
+        return out;
+    };
+    const candlestick = new Array(time.length);
+    for (let i = 0; i < time.length; i++) {
+        candlestick[i] = { time: time[i], open: data.open[i], high: data.high[i], low: data.low[i], close: data.close[i] };
+    }
+    return {
+        candlestick,
+        sma5: points(data.sma5, true),
+        sma20: points(data.sma20, true),
+        rsi_base: points(data.rsi_base, false),
+        rsi_avg: points(data.rsi_avg, false),
+        signals: data.signals || [],
+    };
+}
+
+// Opaque cursor for the next older page (null once history is exhausted)
+let olderCursor = null;
+// Markers currently on the chart (live pushes add to these)
+let currentMarkers = [];
+
 // === Load NIFTY data ===
-async function loadNiftyData(before = null, append = false) {
+async function loadNiftyData(cursor = null, append = false) {
     const interval = document.getElementById('intervalSelect')?.value || '1m';
     const rsiPeriod = document.getElementById('rsiPeriod')?.value || 9;
     const rsiAvg = document.getElementById('rsiAvg')?.value || 3;
-    let url = `/api/data/nifty?interval=${interval}&rsi_period=${rsiPeriod}&rsi_avg=${rsiAvg}`;
-    if (before) url += `&before=${before}&limit=1000`;
+    let url = `/api/data/nifty?interval=${interval}&rsi_period=${rsiPeriod}&rsi_avg=${rsiAvg}&format=columnar`;
+    if (cursor) url += `&cursor=${encodeURIComponent(cursor)}&limit=1000`;
 
     const resp = await fetch(url);
-    const data = await resp.json();
+    let data = await resp.json();
+    const nextCursor = data.next_cursor ?? null;
+    if (data.format === 'columnar') data = expandColumnar(data);
+    olderCursor = nextCursor;
 
     // Build a markers array compatible with the docs:
     // v5 expects time to be a timestamp (number) or time object; here backend sends epoch seconds
@@ -192,6 +226,7 @@ async function loadNiftyData(before = null, append = false) {
         rsiAvgLine.setData(data.rsi_avg);
 
         // set markers robustly
+        currentMarkers = markers;
         setSeriesMarkers(markers);
     } else {
         const mergeData = (oldData, newData) => {
@@ -210,20 +245,82 @@ async function loadNiftyData(before = null, append = false) {
         rsiAvgLine.setData(mergeData(rsiAvgLine.data(), data.rsi_avg));
 
         // update markers too
+        currentMarkers = markers;
         setSeriesMarkers(markers);
     }
 }
 
+// === Live updates (server-sent events) ===
+let liveSource = null;
+
+function stopLiveStream() {
+    if (liveSource) {
+        liveSource.close();
+        liveSource = null;
+    }
+}
+
+// Apply a pushed delta with series.update(); points older than a series' last bar are skipped
+function applyLiveUpdate(payload) {
+    const data = expandColumnar(payload);
+    const apply = (series, points) => {
+        const existing = series.data();
+        const lastTime = existing.length ? existing[existing.length - 1].time : -Infinity;
+        for (const point of points) {
+            if (point.time >= lastTime) series.update(point);
+        }
+    };
+    apply(candlestickSeries, data.candlestick);
+    apply(sma5Line, data.sma5);
+    apply(sma20Line, data.sma20);
+    apply(rsiLine, data.rsi_base);
+    apply(rsiAvgLine, data.rsi_avg);
+
+    if (data.signals.length) {
+        const byTime = new Map(currentMarkers.map(m => [m.time, m]));
+        data.signals.forEach(m => byTime.set(m.time, m));
+        currentMarkers = [...byTime.values()].sort((a, b) => a.time - b.time);
+        setSeriesMarkers(currentMarkers);
+    }
+}
+
+function startLiveStream() {
+    stopLiveStream();
+    const interval = document.getElementById('intervalSelect')?.value || '1m';
+    const rsiPeriod = document.getElementById('rsiPeriod')?.value || 9;
+    const rsiAvg = document.getElementById('rsiAvg')?.value || 3;
+    const throttle = document.getElementById('updateFrequency')?.value || 0;
+    const bars = candlestickSeries.data();
+    let url = `/api/stream/nifty?interval=${interval}&rsi_period=${rsiPeriod}&rsi_avg=${rsiAvg}&throttle=${throttle}`;
+    if (bars.length) url += `&since=${bars[bars.length - 1].time}`;
+
+    liveSource = new EventSource(url);
+    liveSource.onmessage = (event) => applyLiveUpdate(JSON.parse(event.data));
+    // the server dropped our backlog: reload the page of data and resubscribe
+    liveSource.addEventListener('resync', async () => {
+        stopLiveStream();
+        await reloadChart();
+    });
+}
+
+// Full reload; resubscribes to the live stream when it is enabled
+async function reloadChart() {
+    await loadNiftyData();
+    if (document.getElementById('autoUpdate')?.checked) startLiveStream();
+}
+
 // === Lazy load older data ===
 let isLoading = false;
 chart.timeScale().subscribeVisibleLogicalRangeChange(async (newRange) => {
     if (isLoading || !newRange) return;
     const barsInfo = candlestickSeries.barsInLogicalRange(newRange);
-    if (!barsInfo || barsInfo.barsBefore < 10) {
+    if ((!barsInfo || barsInfo.barsBefore < 10) && olderCursor) {
         isLoading = true;
-        const oldest = candlestickSeries.data()[0].time;
-        await loadNiftyData(oldest, true);
-        isLoading = false;
+        try {
+            await loadNiftyData(olderCursor, true);
+        } finally {
+            isLoading = false;
+        }
     }
 });
 
@@ -239,7 +336,7 @@ function loadWatchlist() {
             <div class="text-xs opacity-70">Data from local files</div>
         </div>
     `;
-    niftyItem.addEventListener('click', () => loadNiftyData());
+    niftyItem.addEventListener('click', () => reloadChart());
     watchlistItems.appendChild(niftyItem);
 }
 
@@ -358,13 +455,21 @@ if (themeToggle) {
 
 // === Wire UI controls ===
 const fetchBtn = document.getElementById('fetchData');
-if (fetchBtn) fetchBtn.addEventListener('click', () => loadNiftyData());
+if (fetchBtn) fetchBtn.addEventListener('click', () => reloadChart());
 
 const intervalSelect = document.getElementById('intervalSelect');
-if (intervalSelect) intervalSelect.addEventListener('change', () => loadNiftyData());
+if (intervalSelect) intervalSelect.addEventListener('change', () => reloadChart());
 
 const applyRsi = document.getElementById('applyRsi');
-if (applyRsi) applyRsi.addEventListener('click', () => loadNiftyData());
+if (applyRsi) applyRsi.addEventListener('click', () => reloadChart());
+
+const autoUpdate = document.getElementById('autoUpdate');
+if (autoUpdate) autoUpdate.addEventListener('change', () => (autoUpdate.checked ? startLiveStream() : stopLiveStream()));
+
+const updateFrequency = document.getElementById('updateFrequency');
+if (updateFrequency) updateFrequency.addEventListener('change', () => {
+    if (autoUpdate?.checked) startLiveStream();
+});
 
 // === Initial load ===
 window.addEventListener('load', () => {
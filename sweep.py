@@ -0,0 +1,264 @@
+import argparse
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from candleStore import INTERVAL_MAP, OHLC_AGG
+from finalExcel import ContractDataProvider, strike_rows_from_entries
+from indicators import warmup_bars
+from ingest import ingest_nifty_txt_files
+from partitionStore import read_range
+from signals import compute_indicator_frame, find_entry_points
+from tradeSim import buy_candle_positions
+
+logger = logging.getLogger(__name__)
+
+# Default grids (the finalExcel constants are the 20/20 and RSI 9/3 points)
+TARGET_GRID = list(range(5, 55, 5))
+STOP_GRID = list(range(5, 55, 5))
+RSI_GRID = [(p, a) for p in (7, 9, 14) for a in (3, 5)]
+
+DATA_DIR = Path("data")
+STORE_DIR = Path("data/nifty_candles")
+SWEEP_FILE = Path("sweep_results.parquet")
+SESSION_MINUTES = 375  # NSE cash session, 09:15-15:30
+
+RESULT_COLUMNS = [
+    "rsi_period", "rsi_avg", "target_pts", "stop_pts", "trades", "targets", "stoplosses", "none",
+    "win_rate", "pnl", "avg_pnl",
+]
+
+
+# -------------------- Grid evaluation --------------------
+def first_hit_rows(high, low, pos, buy_price, targets, stops):
+    """
+    First bar at or after `pos` reaching each target (n x T) and each stop
+    (n x S); len(high) where never reached.
+
+    Running max of High / min of Low from the buying candle are monotone,
+    so every level of the grid is found with one binary search instead of
+    a scan per (target, stop) pair.
+    """
+    m = len(high)
+    h = np.where(np.isnan(high), -np.inf, high)
+    l = np.where(np.isnan(low), np.inf, low)
+    before = np.arange(m) < pos[:, None]
+    run_high = np.maximum.accumulate(np.where(before, -np.inf, h), axis=1)
+    run_low = -np.minimum.accumulate(np.where(before, np.inf, l), axis=1)  # ascending
+    up = np.empty((len(pos), len(targets)), dtype=np.int64)
+    down = np.empty((len(pos), len(stops)), dtype=np.int64)
+    for i in range(len(pos)):
+        up[i] = np.searchsorted(run_high[i], buy_price[i] + targets, side="left")
+        down[i] = np.searchsorted(run_low[i], -(buy_price[i] - stops), side="left")
+    return up, down
+
+
+def evaluate_grid(contracts, rows, targets, stops):
+    """
+    Counts and P&L over a (target, stop) grid for one set of entry rows.
+
+    `contracts` maps (strike, type) to the day's 5m frame. A trade earns
+    +target on a target hit (ties go to target, as in the simulator), -stop
+    on a stop hit, and last close - buy price when neither is hit. Entries
+    without data or a buying candle are skipped; a buying candle without a
+    High counts as a "none" trade with no P&L, as tradeSim.simulate_trades
+    reports it.
+    """
+    targets = np.asarray(targets, dtype=np.float64)
+    stops = np.asarray(stops, dtype=np.float64)
+    shape = (len(targets), len(stops))
+    out = {k: np.zeros(shape) for k in ("trades", "targets", "stoplosses", "none", "pnl")}
+
+    by_contract = {}
+    for r in rows:
+        by_contract.setdefault((r["strike"], r["type"]), []).append(r["entry_time"])
+    for key, times in by_contract.items():
+        df_5m = contracts.get(key)
+        if df_5m is None or df_5m.empty:
+            continue
+        high = df_5m["High"].to_numpy(dtype=np.float64)
+        low = df_5m["Low"].to_numpy(dtype=np.float64)
+        pos = buy_candle_positions(df_5m.index, pd.to_datetime(times))
+        pos = pos[pos >= 0]
+        buy_price = high[pos]
+        unpriced = int(np.isnan(buy_price).sum())
+        out["trades"] += unpriced
+        out["none"] += unpriced
+        pos = pos[~np.isnan(buy_price)]
+        buy_price = buy_price[~np.isnan(buy_price)]
+        if not len(pos):
+            continue
+        m = len(high)
+        up, down = first_hit_rows(high, low, pos, buy_price, targets, stops)
+        up, down = up[:, :, None], down[:, None, :]
+        hit_target = (up < m) & (up <= down)
+        hit_stop = (down < m) & (down < up)
+        neither = ~(hit_target | hit_stop)
+        drift = (df_5m["Close"].iat[-1] - buy_price)[:, None, None]
+        out["trades"] += len(pos)
+        out["targets"] += hit_target.sum(axis=0)
+        out["stoplosses"] += hit_stop.sum(axis=0)
+        out["none"] += neither.sum(axis=0)
+        out["pnl"] += (
+            hit_target.sum(axis=0) * targets[:, None]
+            - hit_stop.sum(axis=0) * stops[None, :]
+            + np.where(neither, drift, 0.0).sum(axis=0)
+        )
+    return out
+
+
+def grid_table(rsi_period, rsi_avg, targets, stops, grid):
+    """Flatten evaluate_grid output into RESULT_COLUMNS rows."""
+    t, s = np.meshgrid(targets, stops, indexing="ij")
+    trades = grid["trades"].ravel()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        win_rate = np.where(trades > 0, grid["targets"].ravel() / trades, np.nan)
+        avg_pnl = np.where(trades > 0, grid["pnl"].ravel() / trades, np.nan)
+    return pd.DataFrame({
+        "rsi_period": rsi_period, "rsi_avg": rsi_avg,
+        "target_pts": t.ravel(), "stop_pts": s.ravel(),
+        "trades": trades.astype(np.int64),
+        "targets": grid["targets"].ravel().astype(np.int64),
+        "stoplosses": grid["stoplosses"].ravel().astype(np.int64),
+        "none": grid["none"].ravel().astype(np.int64),
+        "win_rate": win_rate, "pnl": grid["pnl"].ravel(), "avg_pnl": avg_pnl,
+    })[RESULT_COLUMNS]
+
+
+# -------------------- Worker processes --------------------
+# Shared per-process state, installed once by the pool initializer so the
+# candles and contract frames are not pickled into every task.
+_shared = {}
+
+
+def _init_worker(state):
+    _shared.update(state)
+
+
+def _entry_rows(rsi):
+    rsi_period, rsi_avg = rsi
+    df = compute_indicator_frame(_shared["candles"], rsi_period, rsi_avg)
+    entries = find_entry_points(df, _shared["day"], _shared["day"])
+    rows, _ = strike_rows_from_entries(entries)
+    return rows
+
+
+def _evaluate(task):
+    rsi, rows = task
+    grid = evaluate_grid(_shared["contracts"], rows, _shared["targets"], _shared["stops"])
+    return grid_table(rsi[0], rsi[1], _shared["targets"], _shared["stops"], grid)
+
+
+def warmup_start(start, interval="1m", rsi_period=9, rsi_avg=3):
+    """
+    First day to load so indicators from `start` on match the full-history
+    values (indicators.warmup_bars of look-back, converted to sessions and
+    padded for weekends and holidays).
+    """
+    minutes = min(pd.Timedelta(INTERVAL_MAP[interval]).total_seconds() / 60, SESSION_MINUTES)
+    sessions = math.ceil(warmup_bars(rsi_period, rsi_avg) * minutes / SESSION_MINUTES)
+    return pd.Timestamp(start).normalize() - pd.Timedelta(days=sessions * 7 // 5 + 7)
+
+
+def load_candles(interval="1m", start=None, end=None):
+    """
+    NIFTY candles at `interval` from the partitioned store (refreshed from
+    the txt files). With start/end only the partitions and row groups in
+    [start, end) are read; pass warmup_start() as start for indicators.
+    """
+    ingest_nifty_txt_files(DATA_DIR, STORE_DIR, read=False)
+    frame = read_range(STORE_DIR, start, end).set_index("Datetime")
+    if interval != "1m":
+        frame = frame.resample(INTERVAL_MAP[interval]).agg(OHLC_AGG).dropna()
+    return frame
+
+
+def run_sweep(targets=TARGET_GRID, stops=STOP_GRID, rsi_grid=RSI_GRID, expiry_date="2023-12-28",
+              day_needed="2023-12-26", interval="1m", max_workers=None, provider=None, candles=None,
+              out_file=SWEEP_FILE):
+    """
+    Evaluate every (rsi_period, rsi_avg, target, stop) combination in one run.
+
+    Entry points are recomputed per RSI setting; the option contracts they
+    need are loaded once through a shared ContractDataProvider, then the
+    RSI settings are fanned out over a process pool, each worker scoring
+    its full target x stop grid. Returns one row per combination (also
+    saved to `out_file` unless it is None).
+    """
+    t0 = time.perf_counter()
+    rsi_grid = list(rsi_grid)
+    if candles is None:
+        day = pd.Timestamp(day_needed)
+        first = min(warmup_start(day, interval, p, a) for p, a in rsi_grid)
+        candles = load_candles(interval, first, day + pd.Timedelta(days=1))
+    provider = provider or ContractDataProvider()
+    state = {
+        "candles": candles, "day": day_needed,
+        "targets": list(targets), "stops": list(stops), "contracts": {},
+    }
+    workers = max_workers or min(len(rsi_grid), os.cpu_count() or 1)
+
+    _init_worker(state)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state,)) as pool:
+            rows_per_rsi = list(pool.map(_entry_rows, rsi_grid))
+    else:
+        rows_per_rsi = [_entry_rows(rsi) for rsi in rsi_grid]
+
+    # load each contract once for every RSI setting that trades it
+    needed = {(r["strike"], r["type"]) for rows in rows_per_rsi for r in rows}
+    for strike, opt_type in sorted(needed):
+        state["contracts"][(strike, opt_type)] = provider.five_minute_bars(strike, opt_type, expiry_date, day_needed)
+
+    tasks = list(zip(rsi_grid, rows_per_rsi))
+    _init_worker(state)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state,)) as pool:
+            tables = list(pool.map(_evaluate, tasks))
+    else:
+        tables = [_evaluate(task) for task in tasks]
+
+    result = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=RESULT_COLUMNS)
+    if out_file is not None:
+        result.to_parquet(out_file, index=False)
+    logger.info(
+        "Sweep: %d combinations, %d contracts in %.1fs (%s)",
+        len(result), len(needed), time.perf_counter() - t0, provider.stats(),
+    )
+    return result
+
+
+def parse_grid(text):
+    """'5:55:5' (range, end exclusive) or '10,20,30' -> list of points."""
+    if ":" in text:
+        start, stop, step = (float(x) for x in text.split(":"))
+        return np.arange(start, stop, step).tolist()
+    return [float(x) for x in text.split(",")]
+
+
+def parse_rsi_grid(text):
+    """'7/3,9/3,14/5' -> [(7, 3), (9, 3), (14, 5)]."""
+    return [tuple(int(x) for x in pair.split("/")) for pair in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep target/stop and RSI settings over one entry day.")
+    parser.add_argument("--day", default="2023-12-26", help="entry day")
+    parser.add_argument("--expiry", default="2023-12-28")
+    parser.add_argument("--targets", type=parse_grid, default=TARGET_GRID, help="5:55:5 or 10,20,30")
+    parser.add_argument("--stops", type=parse_grid, default=STOP_GRID, help="5:55:5 or 10,20,30")
+    parser.add_argument("--rsi", type=parse_rsi_grid, default=RSI_GRID, help="period/avg pairs, e.g. 7/3,9/3")
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", type=Path, default=SWEEP_FILE)
+    args = parser.parse_args()
+    result = run_sweep(args.targets, args.stops, args.rsi, args.expiry, args.day, args.interval,
+                       args.workers, out_file=args.out)
+    print(f"📊 {len(result)} combinations saved to {args.out}; best by P&L:")
+    print(result.sort_values("pnl", ascending=False).head(10).to_string(index=False))
@@ -0,0 +1,137 @@
+import gzip
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pandas_ta")  # app -> signals
+
+import app as server
+from exportJobs import DONE, FAILED
+from httpCache import IMMUTABLE, REVALIDATE
+
+
+def _session_minutes(days, seed=0):
+    times = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(f"{day} 09:15", f"{day} 15:29", freq="1min") for day in days
+    ]), name="Datetime")
+    close = 21000 + np.cumsum(np.random.default_rng(seed).normal(0, 6, len(times)))
+    return pd.DataFrame({"Open": close, "High": close + 4, "Low": close - 4, "Close": close}, index=times)
+
+
+BASE = _session_minutes(["2023-12-21", "2023-12-22", "2023-12-26", "2023-12-27"])
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "ENTRY_FILE", tmp_path / "entrypoints.parquet")
+    monkeypatch.setattr(server, "ENTRY_EXCEL_FILE", tmp_path / "entrypoints.xlsx")
+    monkeypatch.setattr(server, "EXPORT_DIR", tmp_path / "exports")
+    server.candle_store.publish(BASE, source="test")
+    yield server.app.test_client()
+    # head pages queue exports: let them write under tmp_path before it is unpatched
+    for job in list(server.export_queue._jobs.values()):
+        _wait(job)
+
+
+def _wait(job, timeout=30):
+    deadline = time.monotonic() + timeout
+    while job.status not in (DONE, FAILED):
+        assert time.monotonic() < deadline, f"export job {job.id} still {job.status}"
+        time.sleep(0.05)
+    return job
+
+
+def _next_bar(value=21500.0):
+    t = server.candle_store.get().frame.index[-1] + pd.Timedelta(minutes=1)
+    return pd.DataFrame({"Open": value, "High": value, "Low": value, "Close": value},
+                        index=pd.DatetimeIndex([t], name="Datetime"))
+
+
+def test_head_page_revalidates(client):
+    head = client.get("/api/data/nifty?limit=300")
+    assert head.status_code == 200 and head.headers["Cache-Control"] == REVALIDATE
+    body = head.get_json()
+    assert len(body["candlestick"]) == 300
+    assert body["candlestick"][-1]["time"] == int(BASE.index[-1].timestamp())
+
+    again = client.get("/api/data/nifty?limit=300", headers={"If-None-Match": head.headers["ETag"]})
+    assert again.status_code == 304
+
+    # new data: the same URL names a different body
+    server.candle_store.append(_next_bar())
+    changed = client.get("/api/data/nifty?limit=300", headers={"If-None-Match": head.headers["ETag"]})
+    assert changed.status_code == 200 and changed.headers["ETag"] != head.headers["ETag"]
+
+
+def test_cursor_pages_are_immutable(client):
+    head = client.get("/api/data/nifty?limit=300").get_json()
+    url = f"/api/data/nifty?limit=300&cursor={head['next_cursor']}"
+    older = client.get(url)
+    assert older.headers["Cache-Control"] == IMMUTABLE
+    page = older.get_json()
+    assert page["candlestick"][-1]["time"] < head["candlestick"][0]["time"]
+    assert [c["time"] for c in page["candlestick"]] == [
+        int(t.timestamp()) for t in BASE.index[-600:-300]
+    ]
+    assert page["export_job"] is None
+
+    # appending a bar leaves history pages valid
+    server.candle_store.append(_next_bar())
+    assert client.get(url, headers={"If-None-Match": older.headers["ETag"]}).status_code == 304
+    assert client.get("/api/data/nifty?cursor=not-a-cursor").status_code == 400
+
+
+def test_gzip_response(client):
+    plain = client.get("/api/data/nifty?limit=200")
+    zipped = client.get("/api/data/nifty?limit=200", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.headers["Vary"] == "Accept-Encoding"
+    assert json.loads(gzip.decompress(zipped.data)) == plain.get_json()
+
+
+def test_since_delta(client):
+    server.candle_store.append(_next_bar(21600.0))
+    last = int(server.candle_store.get().frame.index[-1].timestamp())
+    delta = client.get(f"/api/data/nifty?since={last}").get_json()
+    assert [c["time"] for c in delta["candlestick"]] == [last]
+    assert delta["candlestick"][0]["close"] == 21600.0
+    assert delta["data_version"] == server.candle_store.data_version
+
+    unchanged = client.get(f"/api/data/nifty?since={last}&version={delta['data_version']}").get_json()
+    assert unchanged["candlestick"] == [] and unchanged["data_version"] == delta["data_version"]
+
+
+def test_export_job(client):
+    resp = client.post("/api/export/entrypoints?start=2023-12-26&end=2023-12-27")
+    assert resp.status_code == 202
+    _wait(server.export_queue.get(resp.get_json()["id"]))
+    job = client.get(f"/api/export/jobs/{resp.get_json()['id']}").get_json()
+    assert job["status"] == DONE and job["error"] is None
+    assert job["rows"] > 0 and pd.read_parquet(server.ENTRY_FILE).shape[0] == job["rows"]
+    assert job["path"].startswith(str(server.EXPORT_DIR))
+    assert client.get("/api/export/jobs/unknown").status_code == 404
+
+    # the same export on newer data replaces the older job's file
+    server.candle_store.append(_next_bar())
+    newer = _wait(server.export_queue.get(
+        client.post("/api/export/entrypoints?start=2023-12-26&end=2023-12-27").get_json()["id"]
+    ))
+    assert newer.id != job["id"] and newer.group == job["group"]
+    assert sorted(server.EXPORT_DIR.iterdir()) == [newer.path]
+    assert client.get(f"/api/export/jobs/{job['id']}").get_json()["superseded_by"] == newer.id
+
+
+def test_stream_pushes_new_bars(client):
+    key = ("1m", 9, 3, None, None)
+    sub = server.live_stream.subscribe(key)
+    try:
+        server.candle_store.append(_next_bar(21700.0))
+        payload = sub.queue.get(timeout=5)
+        assert payload["time"][-1] == int(server.candle_store.get().frame.index[-1].timestamp())
+        assert payload["close"][-1] == 21700.0
+        assert payload["data_version"] == server.candle_store.data_version
+    finally:
+        server.live_stream.unsubscribe(sub)
@@ -0,0 +1,52 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pandas_ta")  # backtest -> finalExcel -> signals
+
+from backtest import available_expiries, group_entries, nearest_expiry
+
+EXPIRIES = [date(2023, 3, 29), date(2023, 4, 6), date(2023, 6, 28), date(2023, 12, 28)]
+
+
+def test_nearest_expiry_uses_listed_dates():
+    # holiday weeks expire on Wednesday, not on the weekday rule's Thursday
+    assert nearest_expiry("2023-03-27", EXPIRIES) == date(2023, 3, 29)
+    assert nearest_expiry("2023-06-28", EXPIRIES) == date(2023, 6, 28)
+
+
+def test_far_expiry_is_rejected():
+    assert nearest_expiry("2023-03-01", [date(2023, 12, 28)]) is None
+    assert nearest_expiry("2023-06-29", EXPIRIES) is None
+    assert nearest_expiry("2024-01-02", EXPIRIES) is None
+
+
+def test_days_without_expiry_are_skipped():
+    entries = pd.DataFrame({
+        "Type": ["Buy CE", "Buy PE"],
+        "Time": pd.to_datetime(["2023-03-01 10:00", "2023-12-26 10:00"]),
+        "EntryPrice": [17450.0, 21440.0],
+        "ClosePrice": [17460.0, 21430.0],
+    })
+    groups = group_entries(entries, EXPIRIES)
+    assert list(groups) == [date(2023, 12, 28)]
+    assert [day for day, _ in groups[date(2023, 12, 28)]] == ["2023-12-26"]
+
+
+class _Provider:
+    index = None
+
+    def __init__(self, mirror):
+        self.mirror = mirror
+
+
+class _Mirror:
+    def expiries(self):
+        return [date(2023, 6, 28)]
+
+
+def test_available_expiries_include_r2_folders(tmp_path):
+    (tmp_path / "2023-03-29").mkdir()
+    found = available_expiries(_Provider(_Mirror()), expiry_dir=tmp_path)
+    assert found == [date(2023, 3, 29), date(2023, 6, 28)]
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from candleStore import CandleStore
+
+
+def _minutes(start, n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 20000 + np.cumsum(rng.normal(0, 5, n))
+    return pd.DataFrame({
+        "Open": close, "High": close + 3, "Low": close - 3, "Close": close,
+    }, index=pd.date_range(start, periods=n, freq="1min", name="Datetime"))
+
+
+def _store(frame, source="v1", **kw):
+    store = CandleStore(lambda: (frame, source), **kw)
+    store.get()
+    return store
+
+
+def test_data_version_follows_content_not_publish_count():
+    frame = _minutes("2023-12-01 09:15", 500)
+    a, b = _store(frame), _store(frame)
+    b.publish(_minutes("2023-12-01 09:15", 500, seed=1))
+    b.publish(frame)
+    assert b.version == 3
+    assert a.data_version == b.data_version
+    assert _store(_minutes("2023-12-01 09:15", 500, seed=1)).data_version != a.data_version
+
+
+def test_identical_publish_keeps_snapshot():
+    frame = _minutes("2023-12-01 09:15", 500)
+    store = _store(frame)
+    snap = store.get()
+    assert store.publish(frame.copy(), source="v2") is snap
+    assert store.source == "v2" and store.version == 1
+
+
+def test_append_matches_full_publish():
+    frame = _minutes("2023-12-01 09:15", 500)
+    store = _store(frame.iloc[:400])
+    store.append(frame.iloc[399:450].assign(Close=1.0))  # revises bar 399 too
+    store.append(frame.iloc[399:].reset_index())
+    assert store.data_version == _store(frame).data_version
+    assert store.source == "v1"
+    full = _store(frame).get()
+    for interval, level in store.get().levels.items():
+        pd.testing.assert_frame_equal(level, full.level(interval), check_freq=False)
+
+
+def test_mmap_workers_share_data_version(tmp_path):
+    frame = _minutes("2023-12-01 09:15", 500)
+    plain = _store(frame)
+    mapped = [_store(frame, mmap_path=tmp_path / "ohlc.bin") for _ in range(2)]
+    assert {s.data_version for s in mapped} == {plain.data_version}
+    assert len(list(tmp_path.glob("ohlc-*.bin"))) == 1
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_random_appends_match_full_build(tmp_path, mmap):
+    # new bars, revised forming bars, rewinds and gaps, against a fresh load
+    rng = np.random.default_rng(5)
+    frame = _minutes("2023-12-01 09:15", 3000, seed=2)
+    frame = frame.drop(frame.index[rng.choice(len(frame), 300, replace=False)])
+    kw = {"mmap_path": tmp_path / "ohlc.bin", "float_dtype": "float32"} if mmap else {}
+    store = _store(frame.iloc[:1000], **kw)
+    expected = frame.iloc[:1000]
+    for _ in range(60):
+        start = len(expected) - int(rng.integers(0, 40 if rng.random() < 0.9 else 900))
+        bars = frame.iloc[start:start + int(rng.integers(1, 30))]
+        if bars.empty:
+            continue
+        bars = bars.assign(Close=bars["Close"] + rng.normal(0, 1, len(bars)))
+        store.append(bars)
+        cut = expected.index.searchsorted(bars.index[0])
+        expected = pd.concat([expected.iloc[:cut], bars])
+    full = _store(expected, **kw).get()
+    snap = store.get()
+    assert snap.data_version == full.data_version
+    for interval, level in snap.levels.items():
+        pd.testing.assert_frame_equal(level, full.level(interval), check_freq=False)
+
+
+def test_stable_rows_bound_the_changed_tail():
+    frame = _minutes("2023-12-01 09:15", 600)
+    store = _store(frame.iloc[:500])
+    first = store.get()
+    store.append(frame.iloc[500:520])
+    store.append(frame.iloc[518:530].assign(Close=1.0))
+    snap = store.get()
+    for interval in ("1m", "5m", "1h"):
+        stable = snap.stable_rows(interval, first.version)
+        old, new = first.level(interval), snap.level(interval)
+        pd.testing.assert_frame_equal(new.iloc[:stable], old.iloc[:stable], check_freq=False)
+        assert stable >= len(old) - 1 or interval == "1m"
+    assert snap.stable_rows("5m", snap.version) == len(snap.level("5m"))
+    store.publish(frame)
+    assert store.get().stable_rows("5m", first.version) is None
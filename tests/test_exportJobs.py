@@ -0,0 +1,92 @@
+import threading
+import time
+
+from exportJobs import DONE, FAILED, ExportJobQueue, publish_latest, write_atomic
+
+
+def _wait(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while job.status not in (DONE, FAILED):
+        assert time.monotonic() < deadline, f"job {job.id} still {job.status}"
+        time.sleep(0.01)
+    return job
+
+
+def test_identical_params_share_a_job(tmp_path):
+    queue, runs = ExportJobQueue(max_workers=1), []
+
+    def run(job_id):
+        runs.append(job_id)
+        path = tmp_path / f"out-{job_id}.txt"
+        write_atomic(path, lambda tmp: tmp.write_text("rows"))
+        return 1, [path]
+
+    job = queue.submit({"interval": "1m"}, run)
+    assert queue.submit({"interval": "1m"}, run) is job
+    _wait(job)
+    assert job.status == DONE and job.rows == 1 and job.path.read_text() == "rows"
+    assert queue.get(job.id).to_dict()["files"] == [str(job.path)]
+    assert runs == [job.id]
+    assert [p.name for p in tmp_path.iterdir()] == [job.path.name]  # no temp files left
+
+
+def test_failed_job_is_retried():
+    queue, calls = ExportJobQueue(max_workers=1), []
+
+    def run(job_id):
+        calls.append(job_id)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        return 0, []
+
+    failed = _wait(queue.submit({"interval": "5m"}, run))
+    assert failed.status == FAILED and failed.error == "disk full"
+    retried = _wait(queue.submit({"interval": "5m"}, run))
+    assert retried is not failed and retried.status == DONE
+
+
+def test_evicted_jobs_take_their_files(tmp_path):
+    queue = ExportJobQueue(max_workers=1, keep=2)
+
+    def run(job_id):
+        path = tmp_path / f"out-{job_id}.txt"
+        path.write_text("x")
+        return 1, [path]
+
+    jobs = [_wait(queue.submit({"i": i}, run)) for i in range(3)]
+    assert not jobs[0].path.exists() and jobs[2].path.exists()
+    assert queue.get(jobs[0].id) is None
+
+
+def test_newest_job_of_a_group_keeps_its_files(tmp_path):
+    queue = ExportJobQueue(max_workers=2)
+    release = threading.Event()
+
+    def run(job_id, wait=False):
+        if wait:
+            release.wait(5)
+        path = tmp_path / f"out-{job_id}.txt"
+        path.write_text(job_id)
+        return 1, [path]
+
+    first = _wait(queue.submit({"v": 1}, run, group="1m"))
+    slow = queue.submit({"v": 2}, lambda job_id: run(job_id, wait=True), group="1m")
+    newest = _wait(queue.submit({"v": 3}, run, group="1m"))
+    other = _wait(queue.submit({"v": 1, "interval": "5m"}, run, group="5m"))
+    assert first.superseded_by == newest.id and first.path is None
+    release.set()
+    _wait(slow)  # finished after a newer job of its group
+    assert slow.superseded_by == newest.id
+    assert sorted(tmp_path.iterdir()) == sorted([newest.path, other.path])
+
+    # the older parameters again (e.g. the data reverted): exported afresh
+    again = _wait(queue.submit({"v": 1}, run, group="1m"))
+    assert again is not first and again.path.exists() and newest.superseded_by == again.id
+
+
+def test_publish_latest_replaces_atomically(tmp_path):
+    src, dest = tmp_path / "job.txt", tmp_path / "latest.txt"
+    dest.write_text("old")
+    src.write_text("new")
+    publish_latest(src, dest)
+    assert dest.read_text() == "new" and src.exists()
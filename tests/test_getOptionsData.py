@@ -0,0 +1,46 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("s3fs")
+
+from getOptionsData import decode_contract_file
+
+PATH = "desiquant/data/candles/NIFTY/2023-12-28/21000CE.parquet.gz"
+
+
+def _contract_frame():
+    times = pd.date_range("2023-12-26 09:15", periods=50, freq="1min")
+    close = np.linspace(100, 150, 50)
+    return pd.DataFrame({
+        "date": times, "open": close, "high": close + 1, "low": close - 1, "close": close, "oi": 7,
+    })
+
+
+def _encode(df, index=None):
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=index)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("layout", ["column", "named_index", "unnamed_index"])
+def test_decode_reads_times_from_column_or_index(layout):
+    df = _contract_frame()
+    if layout == "named_index":
+        raw = _encode(df.rename(columns={"date": "Datetime"}).set_index("Datetime"))
+    elif layout == "unnamed_index":
+        raw = _encode(df.set_index("date").rename_axis(None))
+    else:
+        raw = _encode(df, index=False)
+
+    contract, times, ohlc = decode_contract_file(raw, PATH)
+    assert contract == ("2023-12-28", 21000, "CE")
+    np.testing.assert_array_equal(times, df["date"].to_numpy(dtype="datetime64[ns]").view(np.int64))
+    np.testing.assert_array_equal(ohlc, df[["open", "high", "low", "close"]].to_numpy())
+
+
+def test_decode_rejects_file_without_ohlc():
+    with pytest.raises(ValueError):
+        decode_contract_file(_encode(_contract_frame()[["date", "close"]], index=False), PATH)
@@ -0,0 +1,78 @@
+import gzip
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, request
+
+from httpCache import IMMUTABLE, REVALIDATE, ResponseCache, etag_matches, make_etag
+
+
+def _app(cache, builds, delay=0.0):
+    app = Flask(__name__)
+
+    @app.route("/page")
+    def page():
+        historical = request.args.get("before") is not None
+        etag = make_etag(None if historical else "v1", request.path, sorted(request.args.items()))
+
+        def build():
+            builds.append(threading.get_ident())
+            time.sleep(delay)
+            return {"bars": list(range(500))}
+
+        return cache.respond(request, etag, IMMUTABLE if historical else REVALIDATE, build)
+
+    return app.test_client()
+
+
+def test_not_modified_and_cache_control():
+    cache, builds = ResponseCache(), []
+    client = _app(cache, builds)
+    head = client.get("/page")
+    assert head.status_code == 200 and head.headers["Cache-Control"] == REVALIDATE
+    assert json.loads(head.data) == {"bars": list(range(500))}
+
+    again = client.get("/page", headers={"If-None-Match": head.headers["ETag"]})
+    assert again.status_code == 304 and again.data == b""
+    assert again.headers["ETag"] == head.headers["ETag"]
+
+    old = client.get("/page?before=1700000000")
+    assert old.headers["Cache-Control"] == IMMUTABLE
+    assert old.headers["ETag"] != head.headers["ETag"]
+    assert len(builds) == 2 and cache.stats()["not_modified"] == 1
+
+
+def test_gzip_negotiation_and_body_reuse():
+    cache, builds = ResponseCache(), []
+    client = _app(cache, builds)
+    plain = client.get("/page")
+    zipped = client.get("/page", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.headers["Vary"] == "Accept-Encoding" and plain.headers["Vary"] == "Accept-Encoding"
+    assert "Content-Encoding" not in plain.headers
+    assert gzip.decompress(zipped.data) == plain.data
+    assert zipped.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+
+    # a tag cached from the gzip response validates the identity one too
+    assert client.get("/page", headers={"If-None-Match": zipped.headers["ETag"]}).status_code == 304
+    client.get("/page", headers={"Accept-Encoding": "gzip"})
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_identical_misses_share_one_build():
+    cache, builds = ResponseCache(), []
+    client = _app(cache, builds, delay=0.2)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        bodies = list(pool.map(lambda _: client.get("/page").data, range(8)))
+    assert len(builds) == 1
+    assert len(set(bodies)) == 1
+
+
+def test_etag_matches_lists_and_weak_tags():
+    etag = make_etag("v1", "/page")
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(make_etag("v2", "/page"), etag)
+    assert not etag_matches(None, etag)
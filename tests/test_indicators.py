@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import INDICATOR_COLUMNS, IndicatorEngine, warmup_bars
+
+ta = pytest.importorskip("pandas_ta")
+
+
+def _series(values, like):
+    # ta.sma / ta.rsi return None for a series shorter than their length
+    return pd.Series(np.nan, index=like.index) if values is None else values
+
+
+def _batch(style, rsi_period):
+    if style == "pandas_ta":
+        return (lambda s: ta.rsi(s, length=rsi_period)), (lambda s, n: ta.sma(s, length=n))
+    pytest.importorskip("s3fs")  # getOptionsData connects through s3fs
+    from getOptionsData import rsi as wilder_rsi, sma as wilder_sma
+    return (lambda s: wilder_rsi(s, length=rsi_period)), wilder_sma
+
+
+@pytest.mark.parametrize("style", ["pandas_ta", "wilder"])
+def test_incremental_matches_batch(style):
+    # seeding on a random prefix and extending bar by bar (with a revised
+    # last bar) must match the batch indicators everywhere
+    rng = np.random.default_rng(0)
+    for trial in range(200):
+        n = int(rng.integers(2, 300))
+        rsi_period, rsi_avg = int(rng.integers(1, 20)), int(rng.integers(1, 8))
+        idx = pd.date_range("2023-12-01 09:15", periods=n, freq="1min")
+        close = pd.Series(np.round(20000 + np.cumsum(rng.normal(0, 5, n)), 2), index=idx)
+        batch_rsi, batch_sma = _batch(style, rsi_period)
+        r = _series(batch_rsi(close), close)
+        expected = pd.DataFrame({
+            "SMA_5": _series(batch_sma(close, 5), close), "SMA_20": _series(batch_sma(close, 20), close),
+            "RSI_Base": r, "RSI_Avg": _series(batch_sma(r, rsi_avg), close),
+        })[INDICATOR_COLUMNS]
+
+        k = int(rng.integers(1, n + 1))
+        engine = IndicatorEngine(rsi_period, rsi_avg, style)
+        engine.seed(close.iloc[:k], batch_rsi(close.iloc[:k]))
+        engine.extend(pd.DataFrame({"Close": [close.iloc[k - 1] + 7.5]}, index=idx[k - 1:k]))
+        got = engine.extend(pd.DataFrame({"Close": close.iloc[k - 1:]}))
+
+        a, b = got.to_numpy(), expected.iloc[k - 1:].to_numpy()
+        assert (np.isnan(a) == np.isnan(b)).all(), trial
+        np.testing.assert_allclose(a, b, rtol=0, atol=1e-8, equal_nan=True)
+
+
+@pytest.mark.parametrize("tolerance", [1e-3, 1e-6])
+def test_windowed_rsi_within_documented_bound(tolerance):
+    # a page computed on page + warmup_bars() stays within ~100 * tolerance
+    # RSI points of the full-history values (same-volatility random walk)
+    rng = np.random.default_rng(1)
+    worst = 0.0
+    for trial in range(50):
+        rsi_period, rsi_avg = int(rng.integers(2, 30)), int(rng.integers(1, 8))
+        n = 3000
+        close = pd.Series(np.round(20000 + np.cumsum(rng.normal(0, 5, n)), 2))
+        full = ta.rsi(close, length=rsi_period)
+        full_avg = ta.sma(full, length=rsi_avg)
+        page_start = int(rng.integers(n // 2, n - 100))
+        span = close.iloc[max(0, page_start - warmup_bars(rsi_period, rsi_avg, tolerance)):]
+        windowed = ta.rsi(span, length=rsi_period)
+        windowed_avg = ta.sma(windowed, length=rsi_avg)
+        diff = np.nanmax(np.abs(np.r_[
+            (windowed - full.loc[span.index]).loc[page_start:].to_numpy(),
+            (windowed_avg - full_avg.loc[span.index]).loc[page_start:].to_numpy(),
+        ]))
+        worst = max(worst, float(diff))
+    assert worst <= 100 * tolerance
+
+
+
+def test_series_extend_uses_stable_rows():
+    from candleStore import CandleStore
+    from indicators import IndicatorSeries
+    from signals import compute_indicator_frame
+
+    rng = np.random.default_rng(2)
+    idx = pd.date_range("2023-12-01 09:15", periods=900, freq="1min", name="Datetime")
+    close = 20000 + np.cumsum(rng.normal(0, 5, len(idx)))
+    frame = pd.DataFrame({"Open": close, "High": close + 2, "Low": close - 2, "Close": close}, index=idx)
+    store = CandleStore(lambda: (frame.iloc[:600], None))
+    before = store.get()
+    df = compute_indicator_frame(before.level("5m"))
+    engine = IndicatorEngine()
+    engine.seed(df["Close"], df["RSI_Base"])
+    series = IndicatorSeries(df, engine, before.version)
+
+    after = store.append(frame.iloc[600:640])
+    extended = series.extend(after.level("5m"), after.stable_rows("5m", before.version), after.version)
+    expected = compute_indicator_frame(after.level("5m"))
+    np.testing.assert_allclose(extended.frame[INDICATOR_COLUMNS], expected[INDICATOR_COLUMNS], atol=1e-8)
+    assert np.shares_memory(extended.frame["Close"].to_numpy(), after.level("5m")["Close"].to_numpy())
+
+    # a rewind past the series' last bar needs a full recompute
+    rewound = store.append(frame.iloc[100:120])
+    assert series.extend(rewound.level("5m"), rewound.stable_rows("5m", before.version)) is None
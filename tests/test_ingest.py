@@ -0,0 +1,57 @@
+import os
+
+import pandas as pd
+
+from ingest import ingest_nifty_txt_files, store_version
+from partitionStore import read_all
+
+
+def _write_month(path, start, n, base=100.0):
+    # monthly files are written newest first
+    times = pd.date_range(start, periods=n, freq="1min")
+    lines = [
+        f"NIFTY,{t:%Y%m%d},{t:%H:%M},{base + i},{base + i + 2},{base + i - 2},{base + i + 1},0,0"
+        for i, t in enumerate(times)
+    ]
+    path.write_text("\n".join(reversed(lines)) + "\n")
+
+
+def test_store_version_tracks_content_not_checks(tmp_path):
+    data, store = tmp_path / "data", tmp_path / "store"
+    data.mkdir()
+    _write_month(data / "2023 NOV NIFTY.txt", "2023-11-30 09:15", 30)
+    ingest_nifty_txt_files(data, store, read=False)
+    first = store_version(store)
+
+    # re-checking or touching a file keeps the version
+    os.utime(data / "2023 NOV NIFTY.txt", ns=(1, 1))
+    _, changed, _ = ingest_nifty_txt_files(data, store, read=False)
+    assert changed == [] and store_version(store) == first
+
+    # new content changes it for every reader of the store
+    _write_month(data / "2023 DEC NIFTY.txt", "2023-12-01 09:15", 30)
+    ingest_nifty_txt_files(data, store, read=False)
+    assert store_version(store) != first
+
+
+def test_changed_and_removed_files_rewrite_their_rows(tmp_path):
+    data, store = tmp_path / "data", tmp_path / "store"
+    data.mkdir()
+    _write_month(data / "2023 NOV NIFTY.txt", "2023-11-30 15:00", 40)  # runs into Dec 1
+    _write_month(data / "2023 DEC NIFTY.txt", "2023-12-04 09:15", 30, base=500.0)
+    df, changed, _ = ingest_nifty_txt_files(data, store)
+    assert len(changed) == 2 and len(df) == 70
+
+    # a shorter re-export drops the old Nov rows, including those it put in Dec
+    _write_month(data / "2023 NOV NIFTY.txt", "2023-11-30 15:00", 10)
+    df, changed, removed = ingest_nifty_txt_files(data, store)
+    assert changed == ["2023 NOV NIFTY.txt"] and removed == []
+    assert len(df) == 40 and df["Datetime"].iloc[9] == pd.Timestamp("2023-11-30 15:09")
+    assert df["Close"].iloc[10] == 501.0
+
+    # a removed file takes its rows and its emptied month with it
+    (data / "2023 NOV NIFTY.txt").unlink()
+    df, changed, removed = ingest_nifty_txt_files(data, store)
+    assert changed == [] and removed == ["2023 NOV NIFTY.txt"]
+    assert len(df) == 30 and not (store / "month=2023-11").exists()
+    pd.testing.assert_frame_equal(df, read_all(store))
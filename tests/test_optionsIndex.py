@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from optionsIndex import OHLC, OptionsIndex
+
+
+@pytest.fixture(scope="module")
+def chain():
+    """Synthetic, shuffled December chain with the true strike/type kept aside."""
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2023-12-26 09:15", "2023-12-27 15:29", freq="1min")
+    pieces = []
+    for strike in range(21000, 22050, 50):
+        for opt_type in ("CE", "PE"):
+            px = 100 + rng.standard_normal(len(times)).cumsum()
+            pieces.append(pd.DataFrame({
+                "Datetime": times, "symbol": f"NIFTY23DEC{strike}{opt_type}", "expiry": "2023-12-28",
+                "strike_truth": strike, "type_truth": opt_type,
+                "Open": px, "High": px + 1, "Low": px - 1, "Close": px,
+            }))
+    return pd.concat(pieces, ignore_index=True).sample(frac=1, random_state=0)
+
+
+def test_index_matches_boolean_masks(chain):
+    index = OptionsIndex.from_frame(chain.drop(columns=["strike_truth", "type_truth"]))
+    assert len(index) == 42
+    assert index.expiries() == [pd.Timestamp("2023-12-28").date()]
+    for strike in (21400, 21450, 21350):
+        for opt_type in ("CE", "PE"):
+            got = index.day(strike, opt_type, "2023-12-28", "2023-12-26")
+            mask = (chain["strike_truth"] == strike) & (chain["type_truth"] == opt_type) \
+                & (chain["Datetime"].dt.normalize() == "2023-12-26")
+            want = chain[mask].set_index("Datetime").sort_index()[OHLC]
+            pd.testing.assert_frame_equal(got, want, check_names=False, check_freq=False)
+            # lookups are views into the contiguous contract blocks
+            assert np.shares_memory(got.to_numpy(), index.frame.to_numpy())
+
+
+def test_unknown_contract_is_none(chain):
+    index = OptionsIndex.from_frame(chain.drop(columns=["strike_truth", "type_truth"]))
+    assert index.day(99999, "CE", "2023-12-28", "2023-12-26") is None
+
+
+def test_frame_without_contract_columns():
+    df = pd.DataFrame({"Datetime": pd.date_range("2023-12-26", periods=3, freq="1min"), "Close": [1.0, 2, 3]})
+    assert OptionsIndex.from_frame(df) is None
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from partitionStore import list_partitions, read_all, read_range, write_partition, write_partitions
+
+
+def _candles(start, end):
+    times = pd.date_range(start, end, freq="1h")
+    close = pd.Series(range(len(times)), dtype=float)
+    return pd.DataFrame({"Datetime": times, "Open": close, "High": close, "Low": close, "Close": close})
+
+
+def test_read_range_is_half_open_across_months(tmp_path):
+    df = _candles("2023-10-20", "2023-12-10")
+    write_partitions(tmp_path, df)
+    assert list(list_partitions(tmp_path)) == ["2023-10", "2023-11", "2023-12"]
+
+    lo, hi = pd.Timestamp("2023-10-31 22:00"), pd.Timestamp("2023-12-01 03:00")
+    got = read_range(tmp_path, lo, hi)
+    expected = df[(df["Datetime"] >= lo) & (df["Datetime"] < hi)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+    assert read_range(tmp_path, "2024-01-01").empty
+    assert len(read_all(tmp_path)) == len(df)
+
+
+def test_empty_partition_is_removed(tmp_path):
+    write_partitions(tmp_path, _candles("2023-11-20", "2023-12-05"))
+    write_partition(tmp_path, "2023-11", None)
+    assert list(list_partitions(tmp_path)) == ["2023-12"]
+    assert read_all(tmp_path)["Datetime"].min() >= pd.Timestamp("2023-12-01")
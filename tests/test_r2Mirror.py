@@ -0,0 +1,80 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from r2Mirror import R2Mirror
+
+PREFIX = "desiquant/data/candles/NIFTY"
+
+
+class DirFS:
+    """Minimal s3fs-shaped view of a local folder (ls with ETags, get_file)."""
+
+    def __init__(self, base, flaky=0):
+        self.base = Path(base)
+        self.flaky = flaky
+        self.ls_calls = self.gets = 0
+
+    def ls(self, path, detail=True):
+        self.ls_calls += 1
+        folder = self.base / path
+        if not folder.is_dir():
+            raise FileNotFoundError(path)
+        return [
+            {"name": f"{path}/{p.name}", "type": "directory", "size": 0} if p.is_dir() else
+            {"name": f"{path}/{p.name}", "type": "file", "size": p.stat().st_size,
+             "ETag": '"%s"' % hashlib.md5(p.read_bytes()).hexdigest()}
+            for p in sorted(folder.iterdir())
+        ]
+
+    def get_file(self, rpath, lpath):
+        self.gets += 1
+        if self.flaky:
+            self.flaky -= 1
+            raise ConnectionError("simulated drop")
+        shutil.copyfile(self.base / rpath, lpath)
+
+
+@pytest.fixture
+def bucket(tmp_path):
+    folder = tmp_path / "bucket" / PREFIX / "2023-12-28"
+    folder.mkdir(parents=True)
+    for strike in range(21000, 21500, 50):
+        (folder / f"{strike}CE.parquet.gz").write_bytes(os.urandom(2048))
+        (folder / f"{strike} PE.parquet").write_bytes(os.urandom(1024))
+    return folder
+
+
+WANTED = [(s, t, "2023-12-28") for s in range(21000, 21600, 50) for t in ("CE", "PE")]
+
+
+def test_prefetch_lists_once_and_retries(bucket, tmp_path):
+    fs = DirFS(tmp_path / "bucket", flaky=2)
+    mirror = R2Mirror(fs, PREFIX, root=tmp_path / "mirror", backoff=0)
+    paths = mirror.prefetch(WANTED)
+    assert fs.ls_calls == 1
+    assert sum(p is not None for p in paths.values()) == 20 and mirror.downloaded == 20
+    assert paths[(21100, "PE", "2023-12-28")].read_bytes() == (bucket / "21100 PE.parquet").read_bytes()
+
+
+def test_second_run_refetches_only_changed_objects(bucket, tmp_path):
+    R2Mirror(DirFS(tmp_path / "bucket"), PREFIX, root=tmp_path / "mirror").prefetch(WANTED)
+    (bucket / "21000CE.parquet.gz").write_bytes(os.urandom(2048))
+    fs = DirFS(tmp_path / "bucket")
+    mirror = R2Mirror(fs, PREFIX, root=tmp_path / "mirror")
+    mirror.prefetch(WANTED)
+    assert (mirror.downloaded, mirror.reused, fs.gets) == (1, 19, 1)
+
+
+def test_expiries_come_from_one_folder_listing(bucket, tmp_path):
+    (bucket.parent / "2023-03-29").mkdir()
+    (bucket.parent / "not-a-date").mkdir()
+    (bucket.parent / "README.parquet").write_bytes(b"")
+    fs = DirFS(tmp_path / "bucket")
+    mirror = R2Mirror(fs, PREFIX, root=tmp_path / "mirror")
+    assert [str(d) for d in mirror.expiries()] == ["2023-03-29", "2023-12-28"]
+    mirror.expiries()
+    assert fs.ls_calls == 1
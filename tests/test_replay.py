@@ -0,0 +1,44 @@
+import pandas as pd
+
+from candleStore import CandleStore
+from ingest import parse_nifty_txt
+from replay import HistoricalReplay, parse_speed, replay_bars
+
+
+def _write_month(path, start, n, newest_first=True):
+    times = pd.date_range(start, periods=n, freq="1min")
+    lines = [f"NIFTY,{t:%Y%m%d},{t:%H:%M},{i},{i + 2},{i - 2},{i + 1},0,0" for i, t in enumerate(times)]
+    path.write_text("\n".join(reversed(lines) if newest_first else lines) + "\n")
+
+
+def test_replay_bars_merges_files_in_time_order(tmp_path):
+    _write_month(tmp_path / "2023 NOV NIFTY.txt", "2023-11-30 15:00", 30)
+    _write_month(tmp_path / "2023 DEC NIFTY.txt", "2023-12-01 09:15", 30, newest_first=False)
+    files = sorted(tmp_path.glob("*.txt"))
+    times = [bar[0] for bar in replay_bars(files)]
+    assert len(times) == 60 and times == sorted(times)
+
+    window = [bar[0] for bar in replay_bars(files, "2023-11-30 15:20", "2023-12-01 09:20")]
+    assert window[0] == pd.Timestamp("2023-11-30 15:20") and window[-1] == pd.Timestamp("2023-12-01 09:20")
+    assert len(window) == 16
+
+
+def test_replay_appends_every_bar(tmp_path):
+    path = tmp_path / "2023 DEC NIFTY.txt"
+    _write_month(path, "2023-12-01 09:15", 120)
+    seed = parse_nifty_txt(path).iloc[:50]
+    store = CandleStore(lambda: (seed, "v1"))
+    store.get()
+
+    replay = HistoricalReplay(store, files=[path], speed=None, start="2023-12-01 09:45", max_batch=25)
+    replay.run()
+    expected = parse_nifty_txt(path).set_index("Datetime")
+    pd.testing.assert_frame_equal(store.get().frame, expected, check_dtype=False, check_freq=False)
+    stats = replay.stats()
+    assert stats["bars"] == 90 and stats["appends"] == 4 and not stats["running"]
+    assert replay.latency({"data_version": store.data_version}) is not None
+
+
+def test_parse_speed():
+    assert parse_speed("max") is None
+    assert parse_speed("60x") == 60.0 and parse_speed(1) == 1.0
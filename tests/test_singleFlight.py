@@ -0,0 +1,44 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleFlight import SingleFlight
+
+
+def test_burst_of_identical_calls_runs_once():
+    flights = SingleFlight()
+    runs = []
+    started = threading.Barrier(32)
+
+    def call(i):
+        started.wait()
+        return flights.do(i % 2, lambda: slow(i % 2))
+
+    def slow(key):
+        runs.append(key)
+        time.sleep(0.2)
+        return {"key": key}
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(call, range(32)))
+    assert sorted(runs) == [0, 1]
+    assert all(r is results[i % 2] for i, r in enumerate(results))
+    assert flights.stats() == {"in_flight": 0, "leaders": 2, "coalesced": 30}
+
+
+def test_error_is_shared_and_not_kept():
+    flights = SingleFlight()
+
+    def boom():
+        time.sleep(0.1)
+        raise ValueError("bad page")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flights.do, "err", boom) for _ in range(4)]
+    assert all(isinstance(f.exception(), ValueError) for f in futures)
+    # nothing is remembered: the next call runs again
+    assert flights.do("err", lambda: 1) == 1
+    with pytest.raises(ValueError):
+        flights.do("err", boom)
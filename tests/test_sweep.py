@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pandas_ta")  # sweep -> signals
+
+from sweep import evaluate_grid, parse_grid, parse_rsi_grid
+from tradeSim import simulate_trades
+
+
+def test_grid_matches_simulator():
+    rng = np.random.default_rng(3)
+    times = pd.date_range("2023-12-26 09:15", "2023-12-26 15:25", freq="5min")
+    contracts, rows = {}, []
+    for strike in (21300, 21350, 21400):
+        close = 120 + rng.standard_normal(len(times)).cumsum() * 4
+        contracts[(strike, "CE")] = pd.DataFrame({
+            "Open": close, "High": close + rng.uniform(0, 8, len(times)),
+            "Low": close - rng.uniform(0, 8, len(times)), "Close": close,
+        }, index=times)
+        rows += [{"strike": strike, "type": "CE", "entry_time": t}
+                 for t in pd.date_range("2023-12-26 09:20", "2023-12-26 15:00", freq="13min")]
+    contracts[(21350, "CE")].iloc[[10, 30], 1] = np.nan  # buying candles without a High
+
+    targets, stops = list(range(2, 62, 2)), list(range(2, 62, 2))
+    grid = evaluate_grid(contracts, rows, targets, stops)
+    for ti, si in ((0, 0), (9, 4), (4, 9), (29, 29)):
+        counts = {"target": 0, "stoploss": 0, "none": 0}
+        for (strike, _), df_5m in contracts.items():
+            times_ = [r["entry_time"] for r in rows if r["strike"] == strike]
+            for sim in simulate_trades(df_5m, times_, targets[ti], stops[si]):
+                counts[sim["outcome"]] += 1
+        got = (grid["targets"][ti, si], grid["stoplosses"][ti, si], grid["none"][ti, si])
+        assert got == (counts["target"], counts["stoploss"], counts["none"]), (targets[ti], stops[si])
+        assert grid["trades"][ti, si] == sum(counts.values())
+    assert np.isfinite(grid["pnl"]).all()
+
+
+def test_cli_grids():
+    assert parse_grid("5:20:5") == [5.0, 10.0, 15.0]
+    assert parse_grid("10,25") == [10.0, 25.0]
+    assert parse_rsi_grid("7/3,14/5") == [(7, 3), (14, 5)]
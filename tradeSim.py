@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+# Cap on the (entries x bars) boolean matrices built per chunk
+MAX_CELLS = 4_000_000
+
+
+def buy_candle_positions(index, buy_times):
+    """
+    Row of the buying candle for each entry: the 5m candle one bar before
+    the entry, or the nearest earlier candle when that one is missing; -1
+    when there is none.
+    """
+    want = (pd.DatetimeIndex(buy_times) - pd.Timedelta(minutes=5)).floor("5min")
+    return index.searchsorted(want, side="right") - 1
+
+
+def first_hits(high, low, pos, target, stop):
+    """
+    (outcome_code, hit_row) per entry: 1 target, -1 stop, 0 neither. Scans
+    start at `pos` and a candle that reaches both levels counts as target.
+    """
+    m = len(high)
+    cols = np.arange(m)
+    outcome = np.zeros(len(pos), dtype=np.int8)
+    hit = np.full(len(pos), -1, dtype=np.int64)
+    step = max(1, MAX_CELLS // max(m, 1))
+    for a in range(0, len(pos), step):
+        p, t, s = pos[a:a + step, None], target[a:a + step, None], stop[a:a + step, None]
+        live = cols >= p
+        up = live & (high >= t)
+        down = live & (low <= s)
+        first_up = np.where(up.any(axis=1), up.argmax(axis=1), m)
+        first_down = np.where(down.any(axis=1), down.argmax(axis=1), m)
+        is_target = (first_up < m) & (first_up <= first_down)
+        is_stop = (first_down < m) & (first_down < first_up)
+        outcome[a:a + step] = np.where(is_target, 1, np.where(is_stop, -1, 0))
+        hit[a:a + step] = np.where(is_target, first_up, np.where(is_stop, first_down, -1))
+    return outcome, hit
+
+
+def simulate_trades(df_5m, buy_times, target_pts, stop_pts):
+    """
+    Batch version of finalExcel.simulate_trade_on_series: one result dict
+    (or None) per entry in `buy_times`, all simulated on the same 5m frame
+    with array operations instead of a per-candle loop.
+    """
+    buy_times = list(buy_times)
+    if df_5m is None or df_5m.empty or not buy_times:
+        return [None] * len(buy_times)
+    index = df_5m.index
+    high = df_5m["High"].to_numpy(dtype=np.float64)
+    low = df_5m["Low"].to_numpy(dtype=np.float64)
+
+    pos = buy_candle_positions(index, pd.to_datetime(buy_times))
+    ok = pos >= 0
+    buy_price = np.where(ok, high[np.maximum(pos, 0)], np.nan)
+    target = buy_price + target_pts
+    stop = buy_price - stop_pts
+    outcome, hit = first_hits(high, low, np.where(ok, pos, len(high)), target, stop)
+
+    names = {1: "target", -1: "stoploss", 0: "none"}
+    out = []
+    for i in range(len(buy_times)):
+        if not ok[i]:
+            out.append(None)
+            continue
+        out.append({
+            "buy_candle_ts": index[pos[i]],
+            "buy_price": float(buy_price[i]),
+            "target_price": float(target[i]),
+            "stop_price": float(stop[i]),
+            "outcome": names[int(outcome[i])],
+            "hit_time": index[hit[i]] if hit[i] >= 0 else None,
+        })
+    return out